@@ -1,119 +1,472 @@
 # analytics.py
+import numpy as np
 import pandas as pd
 import streamlit as st
 from collections import Counter
+from scipy import sparse
+
+
+def load_sparse_co_occurrence(path, metric='conditional'):
+    """
+    Loads a sparse co-occurrence matrix written by cooccurrence.py. Returns (skills, CSR matrix).
+    `metric` picks one of the stored normalizations ('conditional', 'pmi', 'jaccard', 'lift').
+    """
+    with np.load(path) as data:
+        key = 'data' if metric == 'conditional' else f"data_{metric}"
+        if key not in data.files:
+            raise KeyError(f"'{path}' has no '{metric}' matrix; rebuild it with cooccurrence.py.")
+        matrix = sparse.csr_matrix(
+            (data[key], data['indices'], data['indptr']), shape=tuple(data['shape'])
+        )
+        skills = data['skills'].tolist()
+    return skills, matrix
+
 
 class SkillAnalytics:
     """
     An engine that holds and analyzes pre-computed skill data.
-    It is initialized with already-loaded pandas DataFrames.
+    It is initialized with already-loaded pandas DataFrames and interns every skill into a
+    single vocabulary (skill -> int id). The co-occurrence matrix (scipy.sparse CSR), clusters,
+    centrality columns and knowledge-base fields are stored as arrays aligned with those ids.
+    `all_skills` is the whole vocabulary; `matrix_skills` is its prefix labelling the co-occurrence
+    matrix, which is the list the parser validates extracted skills against.
     """
-    def __init__(self, co_occurrence_matrix, skill_clusters, centrality_scores, skill_knowledge_base):
+    def __init__(self, co_occurrence_matrix, skill_clusters, centrality_scores, skill_knowledge_base, skills=None,
+                 bridge_quantile=0.90):
         """
         Initializes the analytics engine with pre-loaded data.
+        `co_occurrence_matrix` is either a dense DataFrame labelled by skill on both axes,
+        or a sparse matrix whose rows/columns are labelled by `skills`.
+        Skills whose betweenness centrality is above the `bridge_quantile` are treated as bridge skills.
         """
-        self.matrix = co_occurrence_matrix
-        self.clusters = skill_clusters
-        self.centrality = centrality_scores
-        self.knowledge_base = skill_knowledge_base # Renamed for clarity
-        
-        if self.matrix is not None:
-            self.all_skills = self.matrix.index.tolist()
+        if co_occurrence_matrix is None:
+            matrix = sparse.csr_matrix((0, 0))
+            skills = []
+        elif isinstance(co_occurrence_matrix, pd.DataFrame):
+            dense = co_occurrence_matrix.reindex(columns=co_occurrence_matrix.index, fill_value=0.0)
+            matrix = sparse.csr_matrix(dense.fillna(0.0).to_numpy(dtype=np.float64))
+            skills = co_occurrence_matrix.index.tolist()
         else:
-            self.all_skills = []
+            matrix = sparse.csr_matrix(co_occurrence_matrix)
+            skills = list(skills)
+
+        # --- Vocabulary: matrix skills keep their row ids, skills only known to the tables are appended ---
+        self._set_vocabulary(skills)
+        self.matrix_skills = self.all_skills[:]
+        for table in (skill_clusters, centrality_scores, skill_knowledge_base):
+            if table is not None:
+                for skill in table.index:
+                    if skill not in self.skill_to_id:
+                        self.skill_to_id[skill] = len(self.all_skills)
+                        self.all_skills.append(skill)
+
+        size = len(self.all_skills)
+        matrix.resize((size, size))
+        self.matrix = matrix
+
+        # --- Aligned per-skill arrays ---
+        self.cluster_ids = self._aligned_column(skill_clusters, 'cluster_id', -1, np.int32)
+        self.has_centrality = self._aligned_mask(centrality_scores)
+        self.degree_centrality = self._aligned_column(centrality_scores, 'degree centrality', np.nan, np.float64)
+        self.betweenness_centrality = None
+        if centrality_scores is not None and 'betweenness centrality' in centrality_scores.columns:
+            self.betweenness_centrality = self._aligned_column(centrality_scores, 'betweenness centrality', np.nan, np.float64)
+
+        self.in_knowledge_base = self._aligned_mask(skill_knowledge_base)
+        self.skill_type_codes, self.skill_type_names = self._aligned_categories(skill_knowledge_base, 'skill_type')
+        self.parent_skill_ids, self.parent_skill_names = self._aligned_categories(
+            skill_knowledge_base, 'parent_skill', exclude=('none',)
+        )
+
+        # Optional top-k neighbor index (see build_top_k_index); None means query the full matrix.
+        self.top_k_ids = None
+        self.top_k_scores = None
+        self._set_derived_arrays(bridge_quantile)
+
+    # Array attributes that fully describe an engine; see to_arrays()/from_arrays().
+    ARRAY_FIELDS = (
+        'cluster_ids', 'has_centrality', 'degree_centrality', 'betweenness_centrality',
+        'in_knowledge_base', 'skill_type_codes', 'parent_skill_ids', 'top_k_ids', 'top_k_scores',
+    )
+
+    def to_arrays(self):
+        """Returns the engine state as a dict of NumPy arrays (used to write the binary bundle)."""
+        matrix = self.matrix.tocsr(copy=True)
+        matrix.sum_duplicates()
+        matrix.sort_indices()
+        arrays = {
+            'skills': np.asarray(self.all_skills, dtype=str),
+            'matrix_data': matrix.data.astype(np.float64, copy=False),
+            'matrix_indices': matrix.indices,
+            'matrix_indptr': matrix.indptr,
+            'matrix_shape': np.asarray(matrix.shape, dtype=np.int64),
+            'skill_type_names': np.asarray(self.skill_type_names, dtype=str),
+            'parent_skill_names': np.asarray(self.parent_skill_names, dtype=str),
+            'matrix_skill_count': np.asarray(len(self.matrix_skills), dtype=np.int64),
+        }
+        for field in self.ARRAY_FIELDS:
+            if getattr(self, field) is not None:
+                arrays[field] = getattr(self, field)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, bridge_quantile=0.90):
+        """Rebuilds an engine from to_arrays() output without copying the (possibly memory-mapped) arrays."""
+        engine = cls.__new__(cls)
+        engine._set_vocabulary(arrays['skills'].tolist())
+        engine.matrix_skills = engine.all_skills[:int(arrays['matrix_skill_count'])]
+        engine.matrix = sparse.csr_matrix(
+            (arrays['matrix_data'], arrays['matrix_indices'], arrays['matrix_indptr']),
+            shape=tuple(arrays['matrix_shape']), copy=False
+        )
+        # to_arrays() writes canonical CSR; flagging it stops scipy from sorting read-only buffers in place.
+        engine.matrix.has_canonical_format = True
+        engine.skill_type_names = arrays['skill_type_names'].tolist()
+        engine.parent_skill_names = arrays['parent_skill_names'].tolist()
+        for field in cls.ARRAY_FIELDS:
+            setattr(engine, field, arrays.get(field))
+        engine._set_derived_arrays(bridge_quantile)
+        return engine
+
+    def shares_memory_with(self, arrays):
+        """True if the co-occurrence matrix wraps the given arrays (e.g. a memory-mapped bundle) without a copy."""
+        return all(
+            np.shares_memory(mine, arrays[name])
+            for mine, name in ((self.matrix.data, 'matrix_data'), (self.matrix.indices, 'matrix_indices'),
+                               (self.matrix.indptr, 'matrix_indptr'))
+        )
+
+    def _set_vocabulary(self, skills):
+        """Sets the id -> skill list and the skill -> id map (first occurrence wins)."""
+        self.all_skills = list(skills)
+        self.skill_to_id = {}
+        for skill_id, skill in enumerate(self.all_skills):
+            self.skill_to_id.setdefault(skill, skill_id)
+
+    def _set_derived_arrays(self, bridge_quantile=0.90):
+        """Precomputes arrays derived from the stored ones (cheap, so they are not written to the bundle)."""
+        # Skill importance used by the weighted score: degree centrality, 0 where it is unknown
+        self.skill_weights = np.where(self.has_centrality, np.nan_to_num(self.degree_centrality), 0.0)
+
+        # Bridge ('transferable') skills: betweenness above the quantile, computed once per engine
+        self.bridge_quantile = bridge_quantile
+        self.bridge_threshold = np.nan
+        self.is_bridge = np.zeros(len(self.all_skills), dtype=bool)
+        if self.betweenness_centrality is not None:
+            betweenness = self.betweenness_centrality[self.has_centrality]
+            betweenness = betweenness[~np.isnan(betweenness)]
+            if len(betweenness):
+                self.bridge_threshold = np.quantile(betweenness, bridge_quantile)
+                self.is_bridge = self.has_centrality & (np.nan_to_num(self.betweenness_centrality, nan=-np.inf) > self.bridge_threshold)
+
+        # Skill-type code per skill id, -1 unless the skill is in the knowledge base (used by domain fit)
+        self.domain_codes = np.where(self.in_knowledge_base, self.skill_type_codes, -1)
+
+    def _aligned_rows(self, table):
+        """Returns (skill ids, row positions) for the first occurrence of each skill in `table`."""
+        if table is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        first = ~table.index.duplicated(keep='first')
+        positions = np.flatnonzero(first)
+        ids = np.fromiter((self.skill_to_id[skill] for skill in table.index[first]), dtype=np.int64, count=len(positions))
+        return ids, positions
+
+    def _aligned_mask(self, table):
+        """Boolean array marking which skill ids appear in `table`."""
+        mask = np.zeros(len(self.all_skills), dtype=bool)
+        mask[self._aligned_rows(table)[0]] = True
+        return mask
+
+    def _aligned_column(self, table, column, fill, dtype):
+        """Copies a numeric column into an array indexed by skill id, using `fill` for unknown skills."""
+        values = np.full(len(self.all_skills), fill, dtype=dtype)
+        if table is None or column not in table.columns:
+            return values
+        ids, positions = self._aligned_rows(table)
+        column_values = pd.to_numeric(table[column].iloc[positions], errors='coerce').to_numpy(dtype=np.float64)
+        known = ~np.isnan(column_values)
+        values[ids[known]] = column_values[known].astype(dtype)
+        return values
+
+    def _aligned_categories(self, table, column, exclude=()):
+        """Encodes a text column as integer codes (-1 = missing) plus the sorted code -> name list."""
+        codes = np.full(len(self.all_skills), -1, dtype=np.int32)
+        if table is None or column not in table.columns:
+            return codes, []
+        ids, positions = self._aligned_rows(table)
+        column_values = table[column].iloc[positions]
+        valid = column_values.notna().to_numpy() & ~column_values.isin(exclude).to_numpy()
+        names, column_codes = np.unique(column_values[valid].astype(str).to_numpy(), return_inverse=True)
+        codes[ids[valid]] = column_codes
+        return codes, names.tolist()
+
+    def _skill_ids(self, skills):
+        """Returns (known skills, their ids) for the skills present in the vocabulary, preserving order."""
+        known = [skill for skill in skills if skill in self.skill_to_id]
+        return known, np.fromiter((self.skill_to_id[skill] for skill in known), dtype=np.int64, count=len(known))
+
+    def _unique_ids(self, skills):
+        """Returns the sorted, de-duplicated ids of the known skills."""
+        return np.unique(self._skill_ids(skills)[1])
+
+    def build_top_k_index(self, k=50):
+        """
+        Precomputes, for every skill, its k strongest related skills (matrix row, highest score
+        first, ties by id) as fixed-width int32 ids (-1 = empty slot) and their exact float64 scores.
+        Memory is bounded by vocabulary x k, independent of how dense the matrix is.
+        """
+        size = self.matrix.shape[0]
+        top_k_ids = np.full((size, k), -1, dtype=np.int32)
+        top_k_scores = np.zeros((size, k), dtype=np.float64)
+        indptr, indices, data = self.matrix.indptr, self.matrix.indices, self.matrix.data
+        for row in range(size):
+            cols = indices[indptr[row]:indptr[row + 1]]
+            values = data[indptr[row]:indptr[row + 1]]
+            keep = (cols != row) & (values > 0)
+            cols, values = cols[keep], values[keep]
+            if len(values) > k:
+                part = np.argpartition(-values, k - 1)[:k]
+                cols, values = cols[part], values[part]
+            order = np.lexsort((cols, -values))
+            top_k_ids[row, :len(order)] = cols[order]
+            top_k_scores[row, :len(order)] = values[order]
+        self.top_k_ids = top_k_ids
+        self.top_k_scores = top_k_scores
+
+    def _best_proxies_from_matrix(self, owned_known, owned_ids, missing_known, missing_ids):
+        """Best owned proxy per missing skill from one (missing x owned) matrix slice."""
+        best_proxies = {}
+        if len(owned_ids) and len(missing_ids):
+            # argmax keeps the first owned skill on ties, like the old nested scan.
+            scores = self.matrix[missing_ids][:, owned_ids].toarray()
+            best = scores.argmax(axis=1)
+            best_scores = scores[np.arange(len(missing_ids)), best]
+            for missing, proxy_pos, score in zip(missing_known, best, best_scores):
+                if score > 0:
+                    best_proxies[missing] = (owned_known[proxy_pos], score)
+        return best_proxies
+
+    def _best_proxies_from_top_k(self, owned_known, owned_ids, missing_known, missing_ids, threshold):
+        """
+        Best owned proxy per missing skill from the top-k index, with the same result as the matrix
+        slice: ties go to the owned skill listed first. A row is only answered from the index when
+        no stronger or equally strong owned proxy can sit below its k-th (last stored) score; the
+        other rows fall back to the matrix slice.
+        """
+        best_proxies = {}
+        if not (len(owned_ids) and len(missing_ids)):
+            return best_proxies
+        owned_position = {}
+        for position, skill_id in enumerate(owned_ids.tolist()):
+            owned_position.setdefault(skill_id, position)
+
+        neighbors = self.top_k_ids[missing_ids]
+        scores = self.top_k_scores[missing_ids]
+        is_owned = np.isin(neighbors, owned_ids) & (neighbors >= 0)
+        last_scores = scores[:, -1]  # 0 when the row has fewer than k neighbors, so nothing is left out
+        fallback = []
+        for row, missing in enumerate(missing_known):
+            owned_slots = np.flatnonzero(is_owned[row])
+            if len(owned_slots):
+                best_score = scores[row, owned_slots[0]]
+                if best_score > last_scores[row]:
+                    tied = neighbors[row, owned_slots[scores[row, owned_slots] == best_score]]
+                    position = min(owned_position[proxy_id] for proxy_id in tied.tolist())
+                    best_proxies[missing] = (owned_known[position], best_score)
+                    continue
+            elif last_scores[row] <= threshold:
+                continue  # Any owned proxy left out of the index scores at most the threshold
+            fallback.append(row)
+
+        if fallback:
+            best_proxies.update(self._best_proxies_from_matrix(
+                owned_known, owned_ids, [missing_known[row] for row in fallback], missing_ids[fallback]
+            ))
+        return best_proxies
 
     def find_potential_skills(self, owned_skills, missing_skills, threshold=0.3):
         """Finds skills the candidate can likely learn based on co-occurrence data."""
+        missing_skills = list(dict.fromkeys(missing_skills))
+        owned_known, owned_ids = self._skill_ids(owned_skills)
+        missing_known, missing_ids = self._skill_ids(missing_skills)
+
+        if self.top_k_ids is not None:
+            best_proxies = self._best_proxies_from_top_k(owned_known, owned_ids, missing_known, missing_ids, threshold)
+        else:
+            best_proxies = self._best_proxies_from_matrix(owned_known, owned_ids, missing_known, missing_ids)
+
         potential_skills = {}
         for missing in missing_skills:
-            best_proxy = None
-            max_score = 0
-            for owned in owned_skills:
-                if missing in self.matrix.index and owned in self.matrix.columns:
-                    score = self.matrix.loc[missing, owned]
-                    if score > max_score:
-                        max_score = score
-                        best_proxy = owned
-            
+            best_proxy, max_score = best_proxies.get(missing, (None, 0))
             if max_score > threshold:
                 potential_skills[missing] = {'proxy': best_proxy, 'score': max_score}
         return potential_skills
 
     def find_transferable_skills(self, owned_skills):
         """Identifies highly versatile 'bridge' skills from the candidate's skill set."""
-        if self.centrality is None or 'betweenness centrality' not in self.centrality.columns:
-            return []
-            
-        bridge_threshold = self.centrality['betweenness centrality'].quantile(0.90)
-        transferable = [
-            skill for skill in owned_skills 
-            if skill in self.centrality.index and self.centrality.loc[skill, 'betweenness centrality'] > bridge_threshold
-        ]
-        return sorted(transferable)
-    
+        owned_known, owned_ids = self._skill_ids(owned_skills)
+        return sorted(skill for skill, is_bridge in zip(owned_known, self.is_bridge[owned_ids]) if is_bridge)
+
     def calculate_weighted_score(self, candidate_skills, job_skills):
         """Calculates a match score weighted by skill importance (Degree Centrality)."""
-        candidate_set = set(candidate_skills)
-        job_set = set(job_skills)
-        job_skills_with_scores = {s for s in job_set if s in self.centrality.index}
-        
-        if not job_skills_with_scores: return 0.0
-
-        total_possible_score = self.centrality.loc[list(job_skills_with_scores)]['degree centrality'].sum()
-        
-        matched_skills = candidate_set.intersection(job_skills_with_scores)
-        if not matched_skills: return 0.0
-            
-        candidate_score = self.centrality.loc[list(matched_skills)]['degree centrality'].sum()
-        
+        job_ids = self._unique_ids(job_skills)
+        job_ids = job_ids[self.has_centrality[job_ids]]
+
+        if not len(job_ids): return 0.0
+
+        # Two masked sums over the aligned weights: all required skills, and the ones the candidate has
+        job_weights = self.skill_weights[job_ids]
+        total_possible_score = job_weights.sum()
+        candidate_score = job_weights[np.isin(job_ids, self._unique_ids(candidate_skills), assume_unique=True)].sum()
+
         return (candidate_score / total_possible_score) * 100 if total_possible_score > 0 else 0
 
+    def _weighted_scores(self, candidates, job_ids):
+        """Weighted scores of the rows of a (candidates x skills) indicator matrix against one job."""
+        job_ids = np.unique(job_ids)
+        job_weights = self.skill_weights[job_ids]
+        total_possible_score = job_weights.sum()
+        scores = np.zeros(candidates.shape[0])
+        if total_possible_score > 0:
+            scores = (candidates[:, job_ids] > 0) @ job_weights / total_possible_score * 100
+        return scores
+
+    def calculate_weighted_scores(self, candidate_skill_sets, job_skills):
+        """Batched calculate_weighted_score: one score per candidate skill list, as a NumPy array."""
+        return self._weighted_scores(self.skill_indicator(candidate_skill_sets), self._unique_ids(job_skills))
+
+    def _primary_domain(self, job_ids):
+        """The job's most common skill-type code (ties go to the first name, like .mode()), or -1."""
+        job_codes = self.domain_codes[job_ids]
+        job_codes = job_codes[job_codes >= 0]
+        return int(np.bincount(job_codes).argmax()) if len(job_codes) else -1
+
     def calculate_domain_fit(self, candidate_skills, job_skills):
         """Calculates how well the candidate's skillset aligns with the job's primary domain using skill types."""
-        # Use the knowledge_base which has the 'skill_type' column
-        job_skill_ontology = self.knowledge_base[self.knowledge_base.index.isin(job_skills)]
-        if job_skill_ontology.empty:
+        # Use the knowledge-base skill types, encoded as integer codes per skill id
+        job_known, job_ids = self._skill_ids(dict.fromkeys(job_skills))
+        primary_code = self._primary_domain(job_ids)
+        if primary_code < 0:
             return 0.0, "N/A", "Could not determine the primary domain for this job."
+        primary_domain = self.skill_type_names[primary_code]
 
-        # Find the most common skill_type in the job description
-        primary_domain = job_skill_ontology['skill_type'].mode()[0]
-        
-        candidate_skill_ontology = self.knowledge_base[self.knowledge_base.index.isin(candidate_skills)]
-        if candidate_skill_ontology.empty:
+        candidate_ids = self._unique_ids(candidate_skills)
+        if not self.in_knowledge_base[candidate_ids].any():
             return 0.0, primary_domain, "Candidate has no skills in the required domain."
-            
-        candidate_skills_in_domain = candidate_skill_ontology[candidate_skill_ontology['skill_type'] == primary_domain]
-        
-        fit_percentage = (len(candidate_skills_in_domain) / len(candidate_skills)) * 100 if candidate_skills else 0
-        
-        domain_representation = ", ".join(job_skill_ontology.head(3).index.str.title())
-        
+
+        candidate_skills_in_domain = int((self.domain_codes[candidate_ids] == primary_code).sum())
+
+        fit_percentage = (candidate_skills_in_domain / len(candidate_skills)) * 100 if candidate_skills else 0
+
+        job_examples = [skill for skill, skill_id in zip(job_known, job_ids) if self.in_knowledge_base[skill_id]][:3]
+        domain_representation = ", ".join(skill.title() for skill in job_examples)
+
         justification = (f"The job's primary domain appears to be **{primary_domain}** (e.g., {domain_representation}). "
-                         f"{len(candidate_skills_in_domain)} of the candidate's {len(candidate_skills)} skills fall within this domain.")
-        
+                         f"{candidate_skills_in_domain} of the candidate's {len(candidate_skills)} skills fall within this domain.")
+
         return fit_percentage, primary_domain, justification
 
+    def _domain_fits(self, candidates, candidate_lengths, job_ids):
+        """Domain-fit percentages of the rows of a (candidates x skills) indicator matrix, plus the domain name."""
+        fits = np.zeros(candidates.shape[0])
+        primary_code = self._primary_domain(job_ids)
+        if primary_code < 0:
+            return fits, "N/A"
+        in_domain = candidates @ (self.domain_codes == primary_code)
+        lengths = np.asarray(candidate_lengths, dtype=np.float64)
+        np.divide(in_domain * 100, lengths, out=fits, where=lengths > 0)
+        return fits, self.skill_type_names[primary_code]
+
+    def calculate_domain_fits(self, candidate_skill_sets, job_skills):
+        """Batched calculate_domain_fit: (one fit percentage per candidate skill list, primary domain name)."""
+        candidate_skill_sets = [list(skills) for skills in candidate_skill_sets]
+        return self._domain_fits(
+            self.skill_indicator(candidate_skill_sets),
+            [len(skills) for skills in candidate_skill_sets],
+            self._skill_ids(dict.fromkeys(job_skills))[1]
+        )
+
+    def skill_indicator(self, skill_sets):
+        """Binary (sets x skills) CSR matrix marking the known skills of each skill list."""
+        indices, indptr = [], [0]
+        for skills in skill_sets:
+            indices.extend(self._unique_ids(skills))
+            indptr.append(len(indices))
+        return sparse.csr_matrix(
+            (np.ones(len(indices)), np.asarray(indices, dtype=np.int64), indptr),
+            shape=(len(skill_sets), len(self.all_skills))
+        )
+
+    def score_candidates(self, candidate_skill_sets, job_skills, threshold=0.3):
+        """
+        Batch form of the per-candidate analysis: scores many candidates against one job at once.
+        Candidates become rows of a (candidates x skills) indicator matrix, so each measure is one
+        product with a per-skill job vector. Returns a dict of lists aligned with the candidates;
+        'potential_skills' lists the skills only, without the proxy each one was inferred from.
+        """
+        candidate_skill_sets = [list(skills) for skills in candidate_skill_sets]
+        candidates = self.skill_indicator(candidate_skill_sets)
+        job_known, job_ids = self._skill_ids(dict.fromkeys(job_skills))
+        job_unknown = [skill for skill in dict.fromkeys(job_skills) if skill not in self.skill_to_id]
+
+        # (candidates x job skills): which required skills each candidate has
+        owned = candidates[:, job_ids].toarray() > 0
+
+        weighted_scores = self._weighted_scores(candidates, job_ids)
+
+        # Potential skills: a missing job skill with any owned proxy scoring above the threshold. This
+        # reads the full matrix; find_potential_skills' top-k path is exact, so both give the same skills.
+        proxies = (self.matrix[job_ids] > threshold).astype(np.float64)
+        potential = ((candidates @ proxies.T).toarray() > 0) & ~owned
+
+        domain_fit_scores, domain_name = self._domain_fits(
+            candidates, [len(skills) for skills in candidate_skill_sets], job_ids
+        )
+
+        results = {'matched_skills': [], 'missing_skills': [], 'potential_skills': [], 'transferable_skills': [],
+                   'weighted_score': weighted_scores.tolist(), 'domain_fit_score': domain_fit_scores.tolist(),
+                   'domain_name': [domain_name] * len(candidate_skill_sets)}
+        for row, skills in enumerate(candidate_skill_sets):
+            skill_set = set(skills)
+            matched = [skill for skill, has in zip(job_known, owned[row]) if has]
+            matched += [skill for skill in job_unknown if skill in skill_set]
+            results['matched_skills'].append(sorted(matched))
+            missing = [skill for skill, has in zip(job_known, owned[row]) if not has]
+            missing += [skill for skill in job_unknown if skill not in skill_set]
+            results['missing_skills'].append(sorted(missing))
+            results['potential_skills'].append(sorted(skill for skill, has in zip(job_known, potential[row]) if has))
+            row_ids = candidates.indices[candidates.indptr[row]:candidates.indptr[row + 1]]
+            results['transferable_skills'].append(sorted(self.all_skills[i] for i in row_ids[self.is_bridge[row_ids]]))
+        return results
+
     def refine_potential_skills(self, potential_skills_dict):
         """Adds 'learnability' context using clusters and the knowledge base."""
-        refined_potential = {}
-
-        for missing, data in potential_skills_dict.items():
-            proxy = data['proxy']
-            learnability = "Medium (Related via usage patterns)" # Default
-            try:
-                # Check 1: Are they in the same skill cluster?
-                if self.clusters.loc[missing, 'cluster_id'] == self.clusters.loc[proxy, 'cluster_id']:
-                    learnability = "High (Within the same skill cluster)"
-                
-                # Check 2 (More specific): Do they share a Parent_Skill from the knowledge base?
-                missing_parent = self.knowledge_base.loc[missing, 'parent_skill']
-                proxy_parent = self.knowledge_base.loc[proxy, 'parent_skill']
-                if pd.notna(missing_parent) and missing_parent != 'none' and missing_parent == proxy_parent:
-                    learnability = f"Very High (Both are '{str(missing_parent).title()}' skills)"
-
-            except KeyError:
-                learnability = "Unknown"
-            
-            refined_potential[missing] = {**data, 'learnability': learnability}
-        
-        return refined_potential
\ No newline at end of file
+        missing_skills = list(potential_skills_dict)
+        proxies = [data.get('proxy') if isinstance(data, dict) else None for data in potential_skills_dict.values()]
+        missing_ids = np.fromiter((self.skill_to_id.get(skill, -1) for skill in missing_skills), dtype=np.int64, count=len(missing_skills))
+        proxy_ids = np.fromiter((self.skill_to_id.get(skill, -1) for skill in proxies), dtype=np.int64, count=len(proxies))
+
+        # Every lookup is on ids known to the vocabulary; the -1 sentinels mark unknown skills, clusters and parents
+        known = np.flatnonzero((missing_ids >= 0) & (proxy_ids >= 0))
+        missing_known, proxy_known = missing_ids[known], proxy_ids[known]
+        missing_clusters, proxy_clusters = self.cluster_ids[missing_known], self.cluster_ids[proxy_known]
+        missing_parents = self.parent_skill_ids[missing_known]
+
+        rated = ((missing_clusters >= 0) & (proxy_clusters >= 0)
+                 & self.in_knowledge_base[missing_known] & self.in_knowledge_base[proxy_known])
+        same_cluster = rated & (missing_clusters == proxy_clusters)
+        same_parent = rated & (missing_parents >= 0) & (missing_parents == self.parent_skill_ids[proxy_known])
+
+        learnability = ["Unknown"] * len(missing_skills)
+        for position, is_rated, in_cluster, in_parent, parent in zip(known, rated, same_cluster, same_parent, missing_parents):
+            if in_parent:
+                learnability[position] = f"Very High (Both are '{self.parent_skill_names[parent].title()}' skills)"
+            elif in_cluster:
+                learnability[position] = "High (Within the same skill cluster)"
+            elif is_rated:
+                learnability[position] = "Medium (Related via usage patterns)"
+
+        return {
+            missing: {**(data if isinstance(data, dict) else {}), 'learnability': rating}
+            for (missing, data), rating in zip(potential_skills_dict.items(), learnability)
+        }
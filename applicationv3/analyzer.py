@@ -1,42 +1,109 @@
 # analyzer.py
-import google.generativeai as genai
 import pandas as pd
 
+LOCAL_MODE_REPORT = ("*AI report skipped: running in local mode without an LLM.* "
+                     "See the data-driven metrics and details below.")
+
 class CVAnalyzer:
-    def __init__(self, ai_model, analytics_engine=None):
+    def __init__(self, ai_model, analytics_engine=None, metrics_cache=None):
         """
         Initializes the analyzer.
         If analytics_engine is None, it runs in a data-less 'demo mode'.
+        If ai_model is None (local mode), the AI report is replaced by a short note.
+        `metrics_cache` (a cache.LRUCache) memoizes the deterministic skill metrics; the AI report is never cached.
         """
         self.model = ai_model
         self.analytics = analytics_engine
         self.is_demo_mode = analytics_engine is None
+        self.metrics_cache = metrics_cache
 
     def analyze(self, cv_data, job_data):
         """
         Orchestrates the analysis. Switches between full analysis and demo mode.
         """
+        analysis_data, prompt = self._prepare(cv_data, job_data)
+        analysis_data['ai_report'] = self._generate_report(prompt)
+        return analysis_data
+
+    def analyze_streaming(self, cv_data, job_data):
+        """
+        Streaming variant of analyze(): returns (analysis_data, report_chunks). The data-driven metrics are
+        computed locally and available at once; the AI report arrives as an iterator of text chunks.
+        """
+        analysis_data, prompt = self._prepare(cv_data, job_data)
+        return analysis_data, self._stream_report(prompt)
+
+    def _prepare(self, cv_data, job_data):
+        """Returns (analysis_data, report prompt) for the current mode."""
         if self.is_demo_mode:
-            return self._analyze_demo_mode(cv_data, job_data)
-        else:
-            return self._analyze_full_mode(cv_data, job_data)
+            analysis_data = self._analyze_demo_mode(cv_data, job_data)
+            return analysis_data, self._demo_report_prompt(analysis_data)
+        analysis_data = self._analyze_full_mode(cv_data, job_data)
+        return analysis_data, self._full_report_prompt(analysis_data)
 
-    def _analyze_full_mode(self, cv_data, job_data):
-        """Performs the comprehensive analysis using the local CSV knowledge base."""
-        cv_skills = cv_data.get('technical_skills', [])
+    def analyze_batch(self, cvs, job_data):
+        """
+        Ranks many parsed CVs ({candidate name: cv_data}) against one parsed job description.
+        Uses the batch analytics path (no AI report per candidate) and returns a ranked DataFrame.
+        """
+        names = list(cvs)
+        cv_skills = [cvs[name].get('technical_skills', []) for name in names]
         job_skills = job_data.get('technical_skills', [])
-        
-        matched_skills = sorted(list(set(cv_skills).intersection(set(job_skills))))
-        missing_skills = sorted(list(set(job_skills).difference(set(cv_skills))))
-        
-        # --- CORRECTED CALLS: Now calling methods on the analytics object ---
+        job_exp = job_data.get('years_of_experience', 0)
+
+        if self.is_demo_mode:
+            job_set = set(job_skills)
+            matched = [sorted(job_set.intersection(skills)) for skills in cv_skills]
+            table = pd.DataFrame({
+                'candidate': names,
+                'matched_skills': matched,
+                'missing_skills': [sorted(job_set.difference(skills)) for skills in cv_skills],
+                'skill_match': [len(m) / len(job_set) * 100 if job_set else 0.0 for m in matched],
+            })
+            sort_by = ['skill_match']
+        else:
+            table = pd.DataFrame({'candidate': names, **self.analytics.score_candidates(cv_skills, job_skills)})
+            sort_by = ['weighted_score', 'domain_fit_score']
+
+        table['meets_experience'] = [cvs[name].get('years_of_experience', 0) >= job_exp for name in names]
+        table = table.sort_values(sort_by + ['meets_experience'], ascending=False, kind='stable').reset_index(drop=True)
+        table.index = table.index + 1
+        table.index.name = 'rank'
+        return table
+
+    def skill_metrics(self, cv_skills, job_skills):
+        """
+        The deterministic, data-driven part of the analysis. It only depends on the two skill sets, so
+        it is keyed by their frozensets and served from `metrics_cache` when one is configured.
+        """
+        key = (frozenset(cv_skills), frozenset(job_skills))
+        if self.metrics_cache is None:
+            return self._compute_skill_metrics(*key)
+        return self.metrics_cache.get_or_compute(key, lambda: self._compute_skill_metrics(*key))
+
+    def _compute_skill_metrics(self, cv_skills, job_skills):
+        """Runs every SkillAnalytics method on canonical (sorted, de-duplicated) skill lists."""
+        cv_skills, job_skills = sorted(cv_skills), sorted(job_skills)
+        matched_skills = sorted(set(cv_skills).intersection(job_skills))
+        missing_skills = sorted(set(job_skills).difference(cv_skills))
+
         potential_skills_raw = self.analytics.find_potential_skills(cv_skills, missing_skills)
-        potential_skills = self.analytics.refine_potential_skills(potential_skills_raw)
-        transferable = self.analytics.find_transferable_skills(cv_skills)
-        weighted_score = self.analytics.calculate_weighted_score(cv_skills, job_skills)
         domain_fit_score, domain_name, domain_justification = self.analytics.calculate_domain_fit(cv_skills, job_skills)
-        # --- END OF CORRECTIONS ---
-        
+        return {
+            "matched_skills": matched_skills,
+            "missing_skills": missing_skills,
+            "potential_skills": self.analytics.refine_potential_skills(potential_skills_raw),
+            "transferable_skills": self.analytics.find_transferable_skills(cv_skills),
+            "weighted_score": self.analytics.calculate_weighted_score(cv_skills, job_skills),
+            "domain_fit_score": domain_fit_score,
+            "domain_name": domain_name,
+            "domain_justification": domain_justification
+        }
+
+    def _analyze_full_mode(self, cv_data, job_data):
+        """Performs the comprehensive analysis using the local CSV knowledge base."""
+        metrics = self.skill_metrics(cv_data.get('technical_skills', []), job_data.get('technical_skills', []))
+
         cv_exp = cv_data.get('years_of_experience', 0)
         job_exp = job_data.get('years_of_experience', 0)
         exp_match_text = "Meets or exceeds" if cv_exp >= job_exp else f"Below requirement ({cv_exp} years vs {job_exp} required)"
@@ -44,18 +111,9 @@ class CVAnalyzer:
         analysis_data = {
             "cv_summary": cv_data.get('summary'),
             "job_summary": job_data.get('summary'),
-            "matched_skills": matched_skills,
-            "missing_skills": missing_skills,
-            "potential_skills": potential_skills,
-            "transferable_skills": transferable,
+            **metrics,
             "experience_match": exp_match_text,
-            "weighted_score": weighted_score,
-            "domain_fit_score": domain_fit_score,
-            "domain_name": domain_name,
-            "domain_justification": domain_justification
         }
-        
-        analysis_data['ai_report'] = self._generate_full_report(analysis_data)
         return analysis_data
 
     def _analyze_demo_mode(self, cv_data, job_data):
@@ -68,12 +126,30 @@ class CVAnalyzer:
             "cv_experience": cv_data.get('years_of_experience', 0),
             "job_experience": job_data.get('years_of_experience', 0)
         }
-        analysis_data['ai_report'] = self._generate_demo_report(analysis_data)
         return analysis_data
         
-    def _generate_demo_report(self, data):
-        """Generates a report using only LLM reasoning, without custom data."""
-        prompt = f"""
+    def _generate_report(self, prompt):
+        """Generates the whole report in one call."""
+        if self.model is None:
+            return LOCAL_MODE_REPORT
+        try:
+            return self.model.generate(prompt)
+        except Exception as e:
+            return f"An error occurred while generating the AI summary: {e}"
+
+    def _stream_report(self, prompt):
+        """Yields the report in chunks as the model generates them."""
+        if self.model is None:
+            yield LOCAL_MODE_REPORT
+            return
+        try:
+            yield from self.model.stream(prompt)
+        except Exception as e:
+            yield f"\n\nAn error occurred while generating the AI summary: {e}"
+
+    def _demo_report_prompt(self, data):
+        """Report prompt using only LLM reasoning, without custom data."""
+        return f"""
         As an expert HR analyst, create a concise evaluation of a job candidate based ONLY on the information provided below. Do not invent scores or metrics.
 
         **CANDIDATE PROFILE:**
@@ -89,17 +165,12 @@ class CVAnalyzer:
         **YOUR TASK:**
         Write a professional hiring assessment. Analyze the candidate's strengths and weaknesses for this specific role based on the skills and experience. Suggest potential areas where the candidate might need to upskill. Conclude with a general recommendation.
         """
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"An error occurred while generating the AI summary: {e}"
-            
-    def _generate_full_report(self, data):
-        """Generates the full report using the rich, data-driven insights."""
+
+    def _full_report_prompt(self, data):
+        """Report prompt using the rich, data-driven insights."""
         potential_str = "".join([f"- For '{s}', the candidate shows promise due to their experience with '{d['proxy']}'. Learnability is rated as: **{d['learnability']}**.\n" for s, d in data['potential_skills'].items()]) or "No strong related skills were found."
 
-        prompt = f"""
+        return f"""
         As an expert HR analyst, create a concise evaluation of a job candidate using the provided data-driven analysis.
 
         **CANDIDATE & JOB SUMMARY:**
@@ -126,9 +197,4 @@ class CVAnalyzer:
 
         ### Strategic Value (Transferable Skills)
         Explain why the identified transferable skills are valuable for this specific role.
-        """
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"An error occurred while generating the AI summary: {e}"
\ No newline at end of file
+        """
\ No newline at end of file
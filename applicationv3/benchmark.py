@@ -0,0 +1,69 @@
+# benchmark.py
+# Offline load test of the full analyze pipeline (parse CV + job, analytics, report) against the
+# deterministic stub backend, so our own overhead can be measured separately from model latency.
+# Both extraction paths are measured: two concurrent calls vs. the single combined call.
+#   python benchmark.py [runs] [stub latency in seconds] [stub seconds per output character]
+import json
+import random
+import sys
+import time
+from analyzer import CVAnalyzer
+from data_loader import load_analytics_engine
+from llm_backends import create_backend
+from parser import DocumentParser
+
+# --- CONFIGURATION ---
+JOB_DATASET_FILE = 'external_csv/jobs/jobDescription/job_dataset.json'
+RUNS = 20
+STUB_LATENCY = 0.0
+STUB_SECONDS_PER_CHAR = 0.0
+
+
+def sample_documents(runs, seed=0):
+    """(cv text, job text) pairs built from the stored job descriptions."""
+    with open(JOB_DATASET_FILE, encoding='utf-8') as f:
+        jobs = json.load(f)
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(runs):
+        cv_job, job = rng.choice(jobs), rng.choice(jobs)
+        cv_text = (f"{cv_job['Title']} with {rng.randint(0, 12)} years of experience. "
+                   f"Skills: {', '.join(cv_job['Skills'])}. " + " ".join(cv_job['Responsibilities']))
+        job_text = (f"We are hiring a {job['Title']} ({job['YearsOfExperience']} years). "
+                    f"Requirements: {', '.join(job['Skills'])}. " + " ".join(job['Responsibilities']))
+        pairs.append((cv_text, job_text))
+    return pairs
+
+
+def run(pairs, engine, backend, combined):
+    """Analyzes every (cv, job) pair; returns the wall time in seconds."""
+    doc_parser = DocumentParser(api_key=None, backend=backend)
+    cv_analyzer = CVAnalyzer(ai_model=backend, analytics_engine=engine)
+    start = time.perf_counter()
+    for cv_text, job_text in pairs:
+        if combined:
+            cv_data, job_data = doc_parser.get_structured_data_pair(cv_text, job_text, engine.matrix_skills)
+        else:
+            cv_data, job_data = doc_parser.get_structured_data_many([cv_text, job_text], engine.matrix_skills)
+        cv_analyzer.analyze(cv_data, job_data)
+    return time.perf_counter() - start
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else RUNS
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else STUB_LATENCY
+    seconds_per_char = float(sys.argv[3]) if len(sys.argv) > 3 else STUB_SECONDS_PER_CHAR
+
+    engine = load_analytics_engine()
+    pairs = sample_documents(runs)
+    for label, combined in (("Two concurrent extraction calls", False), ("Single combined extraction call", True)):
+        backend = create_backend('stub', latency=latency, seconds_per_char=seconds_per_char)
+        total = run(pairs, engine, backend, combined)
+        stats = backend.stats()
+        print(f"{label}: {runs} analyses in {total:.3f}s ({total / runs * 1000:.1f} ms each)")
+        print(f"  {stats['calls'] / runs:.0f} model calls and ~{stats['approx_tokens'] / runs:.0f} tokens "
+              f"({stats['prompt_chars'] / runs:.0f} prompt / {stats['response_chars'] / runs:.0f} response chars) per analysis")
+        print(f"  Model time summed over calls: {stats['model_seconds']:.3f}s")
+
+if __name__ == "__main__":
+    main()
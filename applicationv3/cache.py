@@ -0,0 +1,135 @@
+# cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    A small thread-safe least-recently-used cache with a size bound and hit/miss counters.
+    Streamlit serves every session from threads of one process, so a single instance
+    (kept with st.cache_resource) is shared by all users.
+    """
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def get_or_compute(self, key, compute):
+        """Returns the cached value for `key`, calling `compute()` and storing its result on a miss."""
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+
+        value = compute()  # Outside the lock: a slow computation must not block hits for other keys
+
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        """Hit/miss metrics, e.g. for display in the sidebar."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._items), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+def content_key(*parts):
+    """SHA-256 content address of the given parts (text, model name, versions...)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Persistent, content-addressed cache of LLM extraction results (JSON-serializable values) in SQLite.
+    Entries expire after `ttl` seconds; beyond `max_entries` the least recently used ones are evicted.
+    The database is shared by every process that opens the same file (WAL journal).
+    """
+    def __init__(self, path, ttl=30 * 24 * 3600, max_entries=10000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")  # WAL stays consistent; only the last commits may be lost on power failure
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS entries_created ON entries (created)")
+
+    def get(self, key):
+        """Returns the cached value, or None if it is missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM entries WHERE key = ? AND created >= ?", (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._connection.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        """Stores a value, then drops expired entries and the least recently used ones over the size bound."""
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now)
+            )
+            self._connection.execute("DELETE FROM entries WHERE created < ?", (now - self.ttl,))
+            self._connection.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM entries")
+
+    def stats(self):
+        """Entry count and hit/miss metrics of this process."""
+        with self._lock:
+            size = self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                'size': size, 'max_entries': self.max_entries, 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,239 @@
+# data_loader.py
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+from analytics import SkillAnalytics, load_sparse_co_occurrence
+
+try:
+    import fcntl  # POSIX only; used to serialize bundle rebuilds between processes
+except ImportError:
+    fcntl = None
+
+# --- CONFIGURATION ---
+CO_OCCURRENCE_FILE = 'csv/correspendentFinalCleanTranspose.csv'
+CO_OCCURRENCE_SPARSE_FILE = 'csv/co_occurrence_sparse.npz'  # Preferred; written by cooccurrence.py
+CLUSTERS_FILE = 'csv/skill_clusters.csv'
+CENTRALITY_FILE = 'csv/centrality_measures.csv'
+KNOWLEDGE_BASE_FILE = 'csv/skill_knowledge_base2.csv'
+
+# Association measure read from the sparse matrix file: 'conditional' (P(i|j), the default),
+# 'jaccard', 'lift' or 'pmi'. Only 'conditional' and 'jaccard' are bounded by 1, so the
+# potential-skill threshold (0.3) should be revisited when switching to 'lift' or 'pmi'.
+CO_OCCURRENCE_METRIC = 'conditional'
+
+# Skills whose betweenness centrality is above this quantile count as transferable ('bridge') skills.
+BRIDGE_QUANTILE = 0.90
+
+# Width of the per-skill top-k neighbor index used for potential-skill (proxy) lookups. Results are
+# identical to querying the full co-occurrence matrix, which also answers the rows the index cannot
+# settle (an owned proxy may rank below k). None always queries the full matrix.
+TOP_K_NEIGHBORS = 50
+
+# Compiled binary bundle: one .npy file per array plus a manifest of the sources it was built from.
+BUNDLE_DIR = 'csv/analytics_bundle'
+BUNDLE_VERSION = 3
+MANIFEST_FILE = 'manifest.json'
+LOCK_FILE = 'rebuild.lock'
+
+
+def source_files():
+    """Returns the CSV/NPZ files the analytics engine is built from (the sparse matrix wins over the dense CSV)."""
+    matrix_file = CO_OCCURRENCE_SPARSE_FILE if os.path.exists(CO_OCCURRENCE_SPARSE_FILE) else CO_OCCURRENCE_FILE
+    return [matrix_file, CLUSTERS_FILE, CENTRALITY_FILE, KNOWLEDGE_BASE_FILE]
+
+
+def _file_digest(path):
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _describe_sources(paths):
+    """Manifest entries (size, mtime and content hash) for each source file."""
+    return {
+        path: {'size': os.path.getsize(path), 'mtime_ns': os.stat(path).st_mtime_ns, 'sha256': _file_digest(path)}
+        for path in paths
+    }
+
+
+def _sources_unchanged(recorded, paths):
+    """True if every source matches the manifest. Size+mtime is checked first; the hash only when they differ."""
+    if sorted(recorded) != sorted(paths):
+        return False
+    for path in paths:
+        entry = recorded[path]
+        stat = os.stat(path)
+        if stat.st_size != entry['size']:
+            return False
+        if stat.st_mtime_ns != entry['mtime_ns'] and _file_digest(path) != entry['sha256']:
+            return False
+    return True
+
+
+def load_engine_from_csv(paths=None):
+    """Parses the source files and builds a SkillAnalytics engine (the slow path)."""
+    matrix_file, clusters_file, centrality_file, knowledge_base_file = paths or source_files()
+
+    # 1. Co-occurrence Matrix
+    if matrix_file.endswith('.npz'):
+        matrix_skills, co_occurrence_matrix = load_sparse_co_occurrence(matrix_file, CO_OCCURRENCE_METRIC)
+    else:
+        matrix_skills = None
+        co_occurrence_matrix = pd.read_csv(matrix_file, index_col=0)
+        co_occurrence_matrix.index = co_occurrence_matrix.index.str.lower().str.strip()
+        co_occurrence_matrix.columns = co_occurrence_matrix.columns.str.lower().str.strip()
+        if co_occurrence_matrix.index.name is None or co_occurrence_matrix.index.name == 'unnamed: 0':
+            co_occurrence_matrix.index.name = 'skill'
+
+    # 2. Skill Clusters
+    skill_clusters = pd.read_csv(clusters_file)
+    skill_clusters.columns = [col.lower().strip() for col in skill_clusters.columns] # Force lowercase
+    skill_clusters.set_index('skill', inplace=True)
+
+    # 3. Centrality Scores
+    centrality_scores = pd.read_csv(centrality_file)
+    centrality_scores.columns = [col.lower().strip() for col in centrality_scores.columns] # Force lowercase
+    centrality_scores.set_index('skill', inplace=True)
+
+    # 4. Skill Knowledge Base
+    skill_knowledge_base = pd.read_csv(knowledge_base_file)
+    skill_knowledge_base.columns = [col.lower().strip() for col in skill_knowledge_base.columns]
+    skill_knowledge_base.set_index('canonical_skill', inplace=True)
+
+    engine = SkillAnalytics(
+        co_occurrence_matrix,
+        skill_clusters,
+        centrality_scores,
+        skill_knowledge_base,
+        skills=matrix_skills,
+        bridge_quantile=BRIDGE_QUANTILE
+    )
+    if TOP_K_NEIGHBORS:
+        engine.build_top_k_index(TOP_K_NEIGHBORS)
+    return engine
+
+
+@contextlib.contextmanager
+def bundle_lock(bundle_dir=BUNDLE_DIR):
+    """
+    Exclusive lock on the bundle directory, so only one process rebuilds it at a time.
+    A no-op where fcntl is unavailable (Windows); unique temp files still keep writers apart there.
+    """
+    os.makedirs(bundle_dir, exist_ok=True)
+    with open(os.path.join(bundle_dir, LOCK_FILE), 'a') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _replace_atomically(path, write):
+    """Writes a file through a unique temp file in the same directory, then swaps it in with os.replace."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        os.chmod(tmp_path, 0o644)  # mkstemp creates 0600 files; the bundle is read by every app process
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def write_bundle(engine, paths, bundle_dir=BUNDLE_DIR):
+    """
+    Writes the engine arrays as .npy files plus a manifest. Callers hold bundle_lock(). The manifest
+    is written last, so a half-written bundle is never considered valid, and each file is swapped in
+    with os.replace so processes that still map the previous files keep reading them safely.
+    """
+    manifest_path = os.path.join(bundle_dir, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    os.makedirs(bundle_dir, exist_ok=True)
+
+    arrays = engine.to_arrays()
+    for name, array in arrays.items():
+        _replace_atomically(os.path.join(bundle_dir, f"{name}.npy"), lambda f: np.save(f, array, allow_pickle=False))
+
+    manifest = {'version': BUNDLE_VERSION, 'metric': CO_OCCURRENCE_METRIC, 'top_k': TOP_K_NEIGHBORS,
+                'arrays': sorted(arrays),
+                'sources': _describe_sources(paths)}
+    _replace_atomically(manifest_path, lambda f: f.write(json.dumps(manifest, indent=2).encode('utf-8')))
+
+
+def load_bundle(paths, bundle_dir=BUNDLE_DIR):
+    """Memory-maps a compiled bundle. Returns None if it is missing, from another version, or stale."""
+    manifest_path = os.path.join(bundle_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version') != BUNDLE_VERSION or manifest.get('metric', 'conditional') != CO_OCCURRENCE_METRIC:
+        return None
+    if manifest.get('top_k') != TOP_K_NEIGHBORS:
+        return None
+    if not _sources_unchanged(manifest.get('sources', {}), paths):
+        return None
+
+    # Read-only mappings are backed by the OS page cache, so every Streamlit process on the host
+    # that maps the same bundle shares one physical copy of the matrix.
+    arrays = {
+        name: np.load(os.path.join(bundle_dir, f"{name}.npy"), mmap_mode='r', allow_pickle=False)
+        for name in manifest['arrays']
+    }
+    engine = SkillAnalytics.from_arrays(arrays, bridge_quantile=BRIDGE_QUANTILE)
+    if not engine.shares_memory_with(arrays):
+        print("Warning: the co-occurrence matrix was copied instead of memory-mapped.")
+    return engine
+
+
+def load_analytics_engine(bundle_dir=BUNDLE_DIR):
+    """Loads the engine from the binary bundle, falling back to the CSVs and rebuilding the bundle when sources change."""
+    paths = source_files()
+    engine = load_bundle(paths, bundle_dir)
+    if engine is not None:
+        print(f"Analytics data memory-mapped from '{bundle_dir}'.")
+        return engine
+
+    try:
+        with bundle_lock(bundle_dir):
+            # Another process may have rebuilt the bundle while this one waited for the lock
+            engine = load_bundle(paths, bundle_dir)
+            if engine is not None:
+                print(f"Analytics data memory-mapped from '{bundle_dir}'.")
+                return engine
+            engine = load_engine_from_csv(paths)
+            write_bundle(engine, paths, bundle_dir)
+            print(f"Analytics bundle rebuilt in '{bundle_dir}'.")
+    except OSError as e:
+        print(f"Could not write analytics bundle to '{bundle_dir}': {e}")
+        return engine or load_engine_from_csv(paths)
+    # Re-open what was just written so this process also uses the shared mapping, not a private copy.
+    return load_bundle(paths, bundle_dir) or engine
+
+
+def compile_bundle(bundle_dir=BUNDLE_DIR):
+    """Compile step: always rebuilds the bundle from the current source files. Exits non-zero if any is missing."""
+    paths = source_files()
+    missing = [path for path in paths if not os.path.exists(path)]
+    if missing:
+        sys.exit(f"ERROR: Missing source files: {', '.join(missing)}")
+    engine = load_engine_from_csv(paths)
+    with bundle_lock(bundle_dir):
+        write_bundle(engine, paths, bundle_dir)
+    print(f"Analytics bundle written to '{bundle_dir}'.")
+
+
+if __name__ == "__main__":
+    compile_bundle()
@@ -0,0 +1,66 @@
+# job_store.py
+import json
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURATION ---
+JOB_DATASET_FILE = 'external_csv/jobs/jobDescription/job_dataset.json'
+JOB_SKILL_FIELDS = ('Skills', 'Keywords')  # Fields whose entries are treated as required skills
+
+
+def _job_skills(job):
+    """Cleaned, lower-cased, de-duplicated skill list of one job record."""
+    skills = (str(skill).strip().lower() for field in JOB_SKILL_FIELDS for skill in job.get(field) or [])
+    return list(dict.fromkeys(skill for skill in skills if skill))
+
+
+class JobStore:
+    """
+    An index of stored job descriptions for reverse ranking (one CV against every job).
+    Jobs are rows of a sparse (jobs x skills) indicator matrix over the analytics vocabulary, and
+    each job's total weight (the denominator of calculate_weighted_score) is precomputed, so a query
+    is a single sparse product with the CV's weight vector.
+    """
+    def __init__(self, jobs, analytics_engine):
+        self.analytics = analytics_engine
+        self.jobs = pd.DataFrame({
+            'job_id': [job.get('JobID') for job in jobs],
+            'title': [job.get('Title') for job in jobs],
+            'experience_level': [job.get('ExperienceLevel') for job in jobs],
+            'years_of_experience': [job.get('YearsOfExperience') for job in jobs],
+        })
+        self.job_skills = [_job_skills(job) for job in jobs]
+        self.matrix = analytics_engine.skill_indicator(self.job_skills)
+        self.total_weights = self.matrix @ analytics_engine.skill_weights
+
+    @classmethod
+    def from_json(cls, analytics_engine, path=JOB_DATASET_FILE):
+        """Builds the store from a JSON list of job records (JobID, Title, Skills, Keywords, ...)."""
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f), analytics_engine)
+
+    def __len__(self):
+        return len(self.job_skills)
+
+    def weighted_scores(self, cv_skills):
+        """calculate_weighted_score(cv_skills, job) for every stored job, as one array."""
+        cv_ids = self.analytics._unique_ids(cv_skills)
+        cv_weights = np.zeros(len(self.analytics.skill_weights))
+        cv_weights[cv_ids] = self.analytics.skill_weights[cv_ids]
+        scores = np.zeros(len(self))
+        np.divide(self.matrix @ cv_weights * 100, self.total_weights, out=scores, where=self.total_weights > 0)
+        return scores
+
+    def top_jobs(self, cv_skills, top_n=10):
+        """Returns the top_n best-fitting jobs for a CV's skills, ranked by weighted score."""
+        scores = self.weighted_scores(cv_skills)
+        best = np.argsort(-scores, kind='stable')[:top_n]  # Ties keep dataset order
+
+        cv_set = set(cv_skills)
+        results = self.jobs.iloc[best].copy()
+        results['weighted_score'] = scores[best]
+        results['matched_skills'] = [[skill for skill in self.job_skills[i] if skill in cv_set] for i in best]
+        results = results.reset_index(drop=True)
+        results.index = results.index + 1
+        results.index.name = 'rank'
+        return results
@@ -0,0 +1,182 @@
+# llm_backends.py
+import hashlib
+import json
+import re
+import threading
+import time
+import urllib.request
+from skill_extractor import SkillExtractor, extract_structured_data
+
+# --- CONFIGURATION ---
+GEMINI_MODEL = 'gemini-2.5-flash'
+OLLAMA_MODEL = 'gemma:2b'
+OLLAMA_HOST = 'http://localhost:11434'
+
+
+class LLMBackend:
+    """
+    Common interface of the text-generation backends: `generate(prompt) -> str` and `stream(prompt)`,
+    which yields the response in chunks.
+    Every call is timed and its prompt/response sizes are counted, so callers can separate model latency
+    from their own overhead and compare token usage (see stats(); ~4 characters per token).
+    """
+    name = 'llm'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.model_seconds = 0.0
+        self.prompt_chars = 0
+        self.response_chars = 0
+
+    def generate(self, prompt, timeout=None, temperature=None):
+        """Returns the model's text response to `prompt`. Raises on API or connection errors."""
+        start = time.perf_counter()
+        text = ""
+        try:
+            text = self._generate(prompt, timeout, temperature)
+            return text
+        finally:
+            self._record(start, len(prompt), len(text))
+
+    def stream(self, prompt, timeout=None, temperature=None):
+        """Yields the response to `prompt` in chunks as the model produces them."""
+        start = time.perf_counter()
+        length = 0
+        try:
+            for chunk in self._stream(prompt, timeout, temperature):
+                length += len(chunk)
+                yield chunk
+        finally:
+            self._record(start, len(prompt), length)
+
+    def _record(self, start, prompt_chars, response_chars):
+        with self._lock:
+            self.calls += 1
+            self.model_seconds += time.perf_counter() - start
+            self.prompt_chars += prompt_chars
+            self.response_chars += response_chars
+
+    def _generate(self, prompt, timeout, temperature):
+        raise NotImplementedError
+
+    def _stream(self, prompt, timeout, temperature):
+        # Backends without native streaming deliver the whole response as one chunk
+        yield self._generate(prompt, timeout, temperature)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': self.name, 'calls': self.calls, 'model_seconds': self.model_seconds,
+                'prompt_chars': self.prompt_chars, 'response_chars': self.response_chars,
+                'approx_tokens': (self.prompt_chars + self.response_chars) // 4,
+            }
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini through the google-generativeai client."""
+    def __init__(self, api_key, model_name=GEMINI_MODEL):
+        super().__init__()
+        import google.generativeai as genai  # Only needed for this backend
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name)
+        self.name = f"gemini:{model_name}"
+
+    @staticmethod
+    def _options(timeout, temperature):
+        options = {}
+        if timeout is not None:
+            options['request_options'] = {"timeout": timeout}
+        if temperature is not None:
+            options['generation_config'] = {"temperature": temperature}
+        return options
+
+    def _generate(self, prompt, timeout, temperature):
+        return self.model.generate_content(prompt, **self._options(timeout, temperature)).text
+
+    def _stream(self, prompt, timeout, temperature):
+        for chunk in self.model.generate_content(prompt, stream=True, **self._options(timeout, temperature)):
+            yield chunk.text
+
+
+class OllamaBackend(LLMBackend):
+    """A model served by a local Ollama server (`ollama serve`), over its HTTP API."""
+    def __init__(self, model_name=OLLAMA_MODEL, host=OLLAMA_HOST):
+        super().__init__()
+        self.model_name = model_name
+        self.host = host.rstrip('/')
+        self.name = f"ollama:{model_name}"
+
+    def _request(self, prompt, temperature, stream):
+        payload = {'model': self.model_name, 'prompt': prompt, 'stream': stream}
+        if temperature is not None:
+            payload['options'] = {'temperature': temperature}
+        return urllib.request.Request(
+            f"{self.host}/api/generate", data=json.dumps(payload).encode('utf-8'),
+            headers={'Content-Type': 'application/json'}
+        )
+
+    def _generate(self, prompt, timeout, temperature):
+        with urllib.request.urlopen(self._request(prompt, temperature, False), timeout=timeout) as response:
+            return json.loads(response.read())['response']
+
+    def _stream(self, prompt, timeout, temperature):
+        # Ollama streams one JSON object per line, each holding the next piece of the response
+        with urllib.request.urlopen(self._request(prompt, temperature, True), timeout=timeout) as response:
+            for line in response:
+                if line.strip():
+                    yield json.loads(line).get('response', '')
+
+
+class StubBackend(LLMBackend):
+    """
+    Deterministic offline stand-in for load tests: waits `latency` seconds (plus `seconds_per_char` of
+    output, to mimic generation speed) and answers without any network. Extraction prompts get valid
+    JSON built with the local skill matcher over the prompt's skill list; other prompts get a fixed report.
+    """
+    def __init__(self, latency=0.0, seconds_per_char=0.0):
+        super().__init__()
+        self.latency = latency
+        self.seconds_per_char = seconds_per_char
+        self.name = f"stub:{latency}"
+
+    def _generate(self, prompt, timeout, temperature):
+        text = self._respond(prompt)
+        time.sleep(self.latency + self.seconds_per_char * len(text))
+        return text
+
+    def _stream(self, prompt, timeout, temperature):
+        text = self._respond(prompt)
+        time.sleep(self.latency)  # Time to first token
+        for word in re.findall(r'\S*\s*', text):
+            time.sleep(self.seconds_per_char * len(word))
+            yield word
+
+    def _respond(self, prompt):
+        if "JSON Output" in prompt:
+            return json.dumps(self._extract(prompt))
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8]
+        return (f"### Overall Assessment\nStub report {digest}: the candidate was evaluated offline.\n\n"
+                f"### Potential Fit & Time to Proficiency\nPotential Fit: 50%. Time to Full Proficiency: 1-3 months.\n\n"
+                f"### Strategic Value (Transferable Skills)\nNo model was called for this report.")
+
+    @staticmethod
+    def _extract(prompt):
+        """One JSON object per '---' delimited document; two documents are answered as {"cv", "job"}."""
+        skill_list = re.search(r"Master Skill List[^\n]*\n\s*\[(.*?)\]\n", prompt, re.DOTALL)
+        documents = re.findall(r"---\n(.*?)\n\s*---", prompt, re.DOTALL)
+        skills = skill_list.group(1).split(", ") if skill_list and skill_list.group(1) else []
+        extractor = SkillExtractor(skills)
+        if len(documents) == 2:
+            return {part: extract_structured_data(document, extractor) for part, document in zip(('cv', 'job'), documents)}
+        return extract_structured_data(documents[0] if documents else "", extractor)
+
+
+BACKENDS = {'gemini': GeminiBackend, 'ollama': OllamaBackend, 'stub': StubBackend}
+
+
+def create_backend(name, **options):
+    """Builds a backend by name ('gemini', 'ollama' or 'stub') with its keyword options."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend '{name}'. Choose one of: {', '.join(BACKENDS)}.")
+    return BACKENDS[name](**options)
@@ -1,29 +1,231 @@
 # parser.py
-import google.generativeai as genai
 import streamlit as st
 import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from cache import content_key
+from llm_backends import GeminiBackend
+from skill_extractor import SkillExtractor, extract_structured_data
+
+# --- CONFIGURATION ---
+PARSE_TIMEOUT = 60      # Seconds allowed for each extraction call
+PARSE_MAX_WORKERS = 8   # Extraction calls in flight at once (CV + job description, or a batch of CVs)
+PROMPT_VERSION = 2      # Bump when the extraction prompt changes, so cached results are not reused
+PROMPT_SKILL_LIMIT = 200  # Most relevant vocabulary skills listed in each extraction prompt
+COMBINED_PROMPT_VERSION = 'combined-1'  # Cache version of results from the single-call CV + job prompt
 
 class DocumentParser:
-    def __init__(self, api_key):
-        self.model = self._initialize_model(api_key)
+    def __init__(self, api_key, cache=None, local_only=False, backend=None):
+        """
+        `backend` (an llm_backends.LLMBackend) replaces the default Gemini backend built from `api_key`.
+        `cache` (a cache.ExtractionCache) answers repeated documents without calling the model.
+        With `local_only`, no model is used: skills come from the local SkillExtractor (no-network mode).
+        """
+        self.local_only = local_only
+        if local_only:
+            self.model = None
+        else:
+            self.model = backend or self._initialize_model(api_key)
+        self.cache = cache
+        self._extractor = (None, None)  # (skill list, its SkillExtractor)
+        self._vocabulary_version = (None, None)  # (skill list, its hash); one tuple so threads see a consistent pair
+        self._vocabulary_set = (None, None)  # (skill list, its set) for validating the model's skills
 
     def _initialize_model(self, api_key):
-        """Initializes and returns the Gemini model."""
+        """Initializes and returns the Gemini backend."""
         try:
-            genai.configure(api_key=api_key)
-            return genai.GenerativeModel('gemini-2.5-flash')
+            return GeminiBackend(api_key)
         except Exception as e:
             st.error(f"Error initializing Gemini API. Please check your API key. Details: {e}")
             return None
     
+    def skill_extractor(self, all_known_skills):
+        """Local SkillExtractor for the vocabulary, rebuilt only when a different skill list is passed."""
+        vocabulary, extractor = self._extractor
+        if vocabulary is not all_known_skills:
+            extractor = SkillExtractor(all_known_skills)
+            self._extractor = (all_known_skills, extractor)
+        return extractor
+
     def get_structured_data(self, text_content, all_known_skills):
         """Uses the Gemini model to parse text and extract structured information."""
+        if self.local_only:
+            return extract_structured_data(text_content, self.skill_extractor(all_known_skills))
         if not self.model:
             st.error("Gemini model is not initialized.")
             return None
 
-        # Provide a sample of skills to guide the LLM
-        skills_example_str = ", ".join(all_known_skills[:500])
+        parsed_json, error, response_text = self._extract(text_content, all_known_skills, PARSE_TIMEOUT)
+        if error:
+            self._report_error(error, response_text)
+        return parsed_json
+
+    def get_structured_data_many(self, texts, all_known_skills, timeout=PARSE_TIMEOUT):
+        """
+        Concurrent get_structured_data for independent documents (e.g. the CV and the job description).
+        The LLM calls run in a thread pool, so the total latency approaches that of the slowest call.
+        Returns one result per text, None for a call that failed or did not finish within `timeout` seconds.
+        """
+        if self.local_only:
+            return [self.get_structured_data(text, all_known_skills) for text in texts]
+        if not self.model:
+            st.error("Gemini model is not initialized.")
+            return [None] * len(texts)
+
+        workers = max(1, min(PARSE_MAX_WORKERS, len(texts)))
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures = [executor.submit(self._extract, text, all_known_skills, timeout) for text in texts]
+        # Calls beyond the first `workers` wait for a free thread, so each wave gets its own `timeout`
+        deadline = time.monotonic() + timeout * -(-len(texts) // workers)
+        results = []
+        try:
+            for future in futures:
+                try:
+                    parsed_json, error, response_text = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                except TimeoutError:
+                    parsed_json, error, response_text = None, f"No response within {timeout} seconds.", "No response received from API."
+                except Exception as e:
+                    parsed_json, error, response_text = None, e, "No response received from API."
+                # Streamlit elements can only be written from the script thread, so errors are reported here
+                if error:
+                    self._report_error(error, response_text)
+                results.append(parsed_json)
+        finally:
+            # Do not block on calls that timed out; their results are discarded
+            executor.shutdown(wait=False, cancel_futures=True)
+        return results
+
+    def _report_error(self, error, response_text):
+        st.error(f"An error occurred while communicating with or parsing the AI's response. Details: {error}")
+        st.expander("Show AI Response that caused error:").code(response_text)
+
+    def _vocabulary_hash(self, all_known_skills):
+        """Hash of the skill vocabulary, recomputed only when a different list is passed."""
+        vocabulary, version = self._vocabulary_version
+        if vocabulary is not all_known_skills:
+            version = content_key(*all_known_skills)
+            self._vocabulary_version = (all_known_skills, version)
+        return version
+
+    def known_skills(self, all_known_skills):
+        """Set of the vocabulary for O(1) validation, rebuilt only when a different skill list is passed."""
+        vocabulary, known = self._vocabulary_set
+        if vocabulary is not all_known_skills:
+            known = frozenset(all_known_skills)
+            self._vocabulary_set = (all_known_skills, known)
+        return known
+
+    def _cache_key(self, text_content, all_known_skills, prompt_version=PROMPT_VERSION):
+        """Content address of one extraction: normalized text, model, prompt version and vocabulary."""
+        normalized_text = re.sub(r'\s+', ' ', text_content).strip()
+        return content_key(normalized_text, self.model.name, prompt_version, self._vocabulary_hash(all_known_skills))
+
+    def get_structured_data_pair(self, cv_text, job_text, all_known_skills, timeout=PARSE_TIMEOUT):
+        """
+        Single-call alternative to get_structured_data_many([cv_text, job_text], ...): both documents are
+        extracted by one LLM request returning both JSON objects, saving a round-trip and the repeated
+        instructions. Skills are still validated against the vocabulary. Returns (cv_data, job_data).
+        """
+        if self.local_only:
+            return tuple(self.get_structured_data_many([cv_text, job_text], all_known_skills))
+        if not self.model:
+            st.error("Gemini model is not initialized.")
+            return None, None
+
+        results, error, response_text = self._extract_pair(cv_text, job_text, all_known_skills, timeout)
+        if error:
+            self._report_error(error, response_text)
+        return results
+
+    def _extract_pair(self, cv_text, job_text, all_known_skills, timeout):
+        """One combined extraction call. Returns ((cv_data, job_data), error, response_text)."""
+        cache_keys = [None, None]
+        if self.cache is not None:
+            cache_keys = [self._cache_key(text, all_known_skills, COMBINED_PROMPT_VERSION) for text in (cv_text, job_text)]
+            cached = [self.cache.get(key) for key in cache_keys]
+            if all(data is not None for data in cached):
+                return tuple(cached), None, None
+
+        # One candidate list for both documents, each document's own matches first
+        extractor = self.skill_extractor(all_known_skills)
+        candidate_skills = dict.fromkeys(extractor.candidate_skills(cv_text, PROMPT_SKILL_LIMIT))
+        candidate_skills.update(dict.fromkeys(extractor.candidate_skills(job_text, PROMPT_SKILL_LIMIT)))
+        skills_example_str = ", ".join(candidate_skills)
+
+        prompt = f"""
+        Analyze the two documents provided below: a candidate's CV and a job description. For EACH document, extract the following information. Return ONLY a valid JSON object of the form {{"cv": {{...}}, "job": {{...}}}}. Do not include any other text or markdown formatting.
+
+        1.  "technical_skills": A list of all technical skills mentioned. These skills must be from the provided master list.
+        2.  "soft_skills": A list of soft skills mentioned (e.g., communication, teamwork, leadership).
+        3.  "years_of_experience": An integer representing the total years of professional experience mentioned (for the job: required). If a range is given, take the average. If not mentioned, return 0.
+        4.  "summary": A concise 2-sentence summary of the person's professional profile (cv) or the job's core responsibilities (job).
+
+        Master Skill List (use for "technical_skills" only):
+        [{skills_example_str}]
+
+        CV Text:
+        ---
+        {cv_text}
+        ---
+
+        Job Description Text:
+        ---
+        {job_text}
+        ---
+
+        JSON Output:
+        """
+
+        response_text = None
+        try:
+            response_text = self.model.generate(prompt, timeout=timeout)
+            clean_response = response_text.replace('```json', '').replace('```', '').strip()
+            parsed_json = json.loads(clean_response)
+            results = tuple(
+                self._validate_skills(parsed_json[part], all_known_skills) for part in ('cv', 'job')
+            )
+            for key, data in zip(cache_keys, results):
+                if key is not None:
+                    self.cache.set(key, data)
+            return results, None, None
+
+        except Exception as e:
+            return (None, None), e, response_text if response_text is not None else "No response received from API."
+
+    def _validate_skills(self, parsed_json, all_known_skills):
+        """Keeps only vocabulary skills (lower-cased, de-duplicated, sorted) in the model's 'technical_skills'."""
+        if not isinstance(parsed_json, dict):
+            raise ValueError("Expected a JSON object for each document.")
+        if 'technical_skills' in parsed_json:
+            # Ensure we have a list of strings from the model's output
+            skills_from_ai = parsed_json['technical_skills']
+            if not isinstance(skills_from_ai, list):
+                skills_from_ai = [] # Default to empty list if format is wrong
+
+            known_skills = self.known_skills(all_known_skills)  # Built once per vocabulary, not per document
+            validated_skills = [
+                str(skill).strip().lower() for skill in skills_from_ai 
+                if str(skill).strip().lower() in known_skills
+            ]
+            parsed_json['technical_skills'] = sorted(list(set(validated_skills)))
+        return parsed_json
+
+    def _extract(self, text_content, all_known_skills, timeout):
+        """
+        One extraction call. Returns (parsed_json, error, response_text) instead of writing to the page,
+        so it is safe to run from worker threads.
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(text_content, all_known_skills)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached, None, None
+
+        # List the vocabulary skills relevant to this document (local lexical match) to guide the LLM
+        candidate_skills = self.skill_extractor(all_known_skills).candidate_skills(text_content, PROMPT_SKILL_LIMIT)
+        skills_example_str = ", ".join(candidate_skills)
 
         prompt = f"""
         Analyze the document text provided below. Your task is to extract the following information and return it ONLY as a valid JSON object. Do not include any other text or markdown formatting.
@@ -44,33 +246,18 @@ class DocumentParser:
         JSON Output:
         """
         
-        # --- START OF CORRECTION ---
-        response = None # Initialize response to None before the try block
+        response_text = None # Initialize the response to None before the try block
         try:
-            response = self.model.generate_content(prompt)
+            response_text = self.model.generate(prompt, timeout=timeout)
             # Clean up potential markdown formatting from the response
-            clean_response = response.text.replace('```json', '').replace('```', '').strip()
-            parsed_json = json.loads(clean_response)
-            
+            clean_response = response_text.replace('```json', '').replace('```', '').strip()
             # Validate and clean the skills list one more time
-            if 'technical_skills' in parsed_json:
-                # Ensure we have a list of strings from the model's output
-                skills_from_ai = parsed_json['technical_skills']
-                if not isinstance(skills_from_ai, list):
-                    skills_from_ai = [] # Default to empty list if format is wrong
-
-                validated_skills = [
-                    str(skill).strip().lower() for skill in skills_from_ai 
-                    if str(skill).strip().lower() in all_known_skills
-                ]
-                parsed_json['technical_skills'] = sorted(list(set(validated_skills)))
-            
-            return parsed_json
+            parsed_json = self._validate_skills(json.loads(clean_response), all_known_skills)
+
+            if cache_key is not None:
+                self.cache.set(cache_key, parsed_json)
+            return parsed_json, None, None
 
         except Exception as e:
-            # Now we can safely check if response exists before trying to access it
-            response_text = response.text if response else "No response received from API."
-            st.error(f"An error occurred while communicating with or parsing the AI's response. Details: {e}")
-            st.expander("Show AI Response that caused error:").code(response_text)
-            return None
-        # --- END OF CORRECTION ---
\ No newline at end of file
+            # Now we can safely check if a response exists before showing it
+            return None, e, response_text if response_text is not None else "No response received from API."
@@ -0,0 +1,167 @@
+# skill_extractor.py
+import re
+
+# A token is a run of letters/digits, optionally joined by . + # / ' and optionally starting with '.'
+# (".net") or ending with '+'/'#' ("c++", "c#"). A sentence-final period is not part of the token.
+# Hyphens separate tokens, so 'machine-learning' and 'machine learning' tokenize the same way.
+TOKEN_PATTERN = re.compile(r"\.?[a-z0-9]+(?:[.+#/'][a-z0-9]+)*[+#]*", re.IGNORECASE)
+YEARS_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*\+?\s*(?:years?|yrs?)\b")
+_END = ''  # Trie key marking a complete skill (tokens are never empty)
+
+# Single-word skills that are also everyday words, or are one or two letters long ('r', 'go', 'ai'),
+# are only matched where the document's casing marks them as a name (see SkillExtractor._is_mention).
+AMBIGUOUS_MAX_LETTERS = 2
+AMBIGUOUS_WORDS = frozenset({
+    'ant', 'chef', 'crystal', 'dart', 'elm', 'ember', 'express', 'flask', 'go', 'helm', 'jest', 'julia',
+    'lime', 'make', 'mercury', 'meteor', 'pandas', 'pascal', 'puppet', 'react', 'room', 'ruby', 'rust',
+    'salt', 'scheme', 'shell', 'soap', 'spa', 'spring', 'swift', 'unity',
+})
+
+
+def _tokens(text):
+    """(token, start, end) of every skill token in `text`: lower-cased, with a possessive "'s" removed."""
+    for match in TOKEN_PATTERN.finditer(text):
+        token, end = match.group().lower(), match.end()
+        if token.endswith("'s") and len(token) > 2:
+            token, end = token[:-2], end - 2
+        yield token, match.start(), end
+
+
+def _slash_parts(token, start):
+    """(part, start, end) of each '/'-separated part of a token, e.g. 'python/django' -> 'python', 'django'."""
+    parts = []
+    for part in token.split('/'):
+        parts.append((part, start, start + len(part)))
+        start += len(part) + 1
+    return parts
+
+
+def _sub_tokens(tokens):
+    """Tokens with every '/'-joined one replaced by its parts ('html/css' -> 'html', 'css')."""
+    return [part for token in tokens for part in token.split('/')]
+
+
+def tokenize(text):
+    """Lower-cased skill tokens of a text, e.g. 'ASP.NET and C# (5+ years)' -> ['asp.net', 'and', 'c#', '5', 'years']."""
+    return [token for token, _, _ in _tokens(text)]
+
+
+class SkillExtractor:
+    """
+    Deterministic, offline skill matcher. Every vocabulary skill is tokenized into a token trie, so a
+    document is matched in one pass over its tokens, trying at most the longest skill's length at each
+    position. Multi-word skills ('machine learning', 'sql server') and punctuated ones ('.net', 'c#',
+    'asp.net', 'node.js') are matched as whole tokens, so 'c' never matches inside 'c#'. A '/'-joined
+    token is matched whole when it is part of a skill ('ci/cd', 'html/css') and otherwise part by part,
+    so 'Python/Django' finds 'python' and 'django' and 'Java/Spring Boot' finds 'java' and 'spring boot'.
+    Ambiguous single-word skills ('r', 'go', 'swift') need the casing of a name in the text, so
+    "R&D" or "we go to" do not match them.
+    """
+    def __init__(self, skills):
+        self.trie = {}
+        self.max_tokens = 0
+        self.skill_tokens = {}   # skill -> its distinct tokens, '/'-joined ones split into their parts
+        self.token_skills = {}   # token -> skills containing it (inverted index for candidate_skills)
+        for skill in skills:
+            tokens = tokenize(skill)
+            if not tokens or skill in self.skill_tokens:
+                continue
+            self.skill_tokens[skill] = set(_sub_tokens(tokens))
+            for token in self.skill_tokens[skill]:
+                self.token_skills.setdefault(token, []).append(skill)
+            node = self.trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node.setdefault(_END, skill)  # The first spelling of a skill wins
+            self.max_tokens = max(self.max_tokens, len(tokens))
+        self.ambiguous = {skill for skill in self.skill_tokens if self._is_ambiguous(tokenize(skill))}
+
+    @staticmethod
+    def _is_ambiguous(tokens):
+        """A one-word skill that is an everyday word or only one or two letters long."""
+        return len(tokens) == 1 and (tokens[0] in AMBIGUOUS_WORDS or
+                                     (tokens[0].isalpha() and len(tokens[0]) <= AMBIGUOUS_MAX_LETTERS))
+
+    @staticmethod
+    def _is_mention(text, start, end):
+        """
+        Whether an ambiguous word is written as a skill name: upper case ('R', 'AI') or a capitalized
+        word that does not start a sentence ('Go'), and not part of an abbreviation such as 'R&D'.
+        """
+        word = text[start:end]
+        if text[start - 1:start] == '&' or text[end:end + 1] == '&':
+            return False
+        if word.isupper():
+            return True
+        if not word[0].isupper():
+            return False
+        before = text[:start].rstrip()
+        return bool(before) and before[-1] not in '.!?'
+
+    def _match(self, text, tokens):
+        """
+        Runs the trie over (token, start, end) records. Returns the skills found, in order of first
+        appearance, and the positions of the tokens that are part of a match.
+        """
+        found, covered = {}, set()
+        for start in range(len(tokens)):
+            node = self.trie
+            for position in range(start, min(start + self.max_tokens, len(tokens))):
+                node = node.get(tokens[position][0])
+                if node is None:
+                    break
+                skill = node.get(_END)
+                if skill is not None and (
+                        position > start or skill not in self.ambiguous or self._is_mention(text, *tokens[start][1:])):
+                    found.setdefault(skill, None)
+                    covered.update(range(start, position + 1))
+        return list(found), covered
+
+    def find_skills(self, text):
+        """Vocabulary skills mentioned in `text`, in order of first appearance (overlapping matches included)."""
+        tokens = list(_tokens(text))
+        found, covered = self._match(text, tokens)
+        # Slash lists ('Python/Django') that match nothing as a whole are matched again part by part
+        split = {position for position, (token, _, _) in enumerate(tokens) if '/' in token and position not in covered}
+        if not split:
+            return found
+        expanded = []
+        for position, (token, start, end) in enumerate(tokens):
+            expanded.extend(_slash_parts(token, start) if position in split else [(token, start, end)])
+        return self._match(text, expanded)[0]
+
+    def candidate_skills(self, text, limit=200, min_overlap=0.5):
+        """
+        The vocabulary skills most relevant to `text`, for the LLM prompt: exact matches first, then
+        skills sharing at least `min_overlap` of their tokens with the text (most overlap first), up to `limit`.
+        Overlap is counted on '/'-separated parts, so 'Python/Django' shares 'python' and 'django'.
+        """
+        candidates = dict.fromkeys(self.find_skills(text))
+        overlap = {}
+        for token in dict.fromkeys(_sub_tokens(tokenize(text))):  # Distinct tokens in document order, for a stable prompt
+            for skill in self.token_skills.get(token, ()):
+                # An ambiguous skill not found above was rejected by its context, not partly matched
+                if skill not in candidates and skill not in self.ambiguous:
+                    overlap[skill] = overlap.get(skill, 0) + 1
+        partial = [
+            (count / len(self.skill_tokens[skill]), skill) for skill, count in overlap.items()
+            if count / len(self.skill_tokens[skill]) >= min_overlap
+        ]
+        partial.sort(key=lambda item: -item[0])  # Stable: ties keep the order the skills were found in
+        candidates.update((skill, None) for _, skill in partial)
+        return list(candidates)[:limit]
+
+
+def extract_structured_data(text_content, extractor):
+    """
+    No-network stand-in for the LLM extraction: same keys as DocumentParser.get_structured_data,
+    with skills from the local extractor, the largest 'N years' figure and the opening sentences as summary.
+    """
+    years = [float(match) for match in YEARS_PATTERN.findall(text_content.lower())]
+    sentences = re.split(r'(?<=[.!?])\s+', re.sub(r'\s+', ' ', text_content).strip())
+    return {
+        'technical_skills': sorted(extractor.find_skills(text_content)),
+        'soft_skills': [],
+        'years_of_experience': int(max(years)) if years else 0,
+        'summary': " ".join(sentences[:2])[:400],
+    }
@@ -1,5 +1,5 @@
 import pandas as pd
-import google.generativeai as genai
+from llm_backends import create_backend
 import time
 import re
 import os
@@ -16,6 +16,9 @@ SKILLS_SOURCE_FILE = 'csv/correspendentFinalCleanTranspose.csv'
 # The name of the new file we will create
 OUTPUT_ONTOLOGY_FILE = 'skill_ontology.csv'
 
+# Which model categorizes the skills: 'gemini' (uses API_KEY), 'ollama' (local server) or 'stub' (offline dry run)
+LLM_BACKEND = 'gemini'
+
 # How many skills to process in each API call.
 # Keep this reasonably low to avoid overly long prompts.
 BATCH_SIZE = 50
@@ -23,17 +26,17 @@ BATCH_SIZE = 50
 # --- SCRIPT LOGIC ---
 
 def initialize_gemini():
-    """Initializes the Gemini API and returns the model object."""
+    """Initializes the configured LLM backend (Gemini by default) and returns it."""
     try:
-        genai.configure(api_key=API_KEY)
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        # Quick test to ensure the API key is valid
-        model.generate_content("test", generation_config={"max_output_tokens": 10})
-        print("Successfully connected to Google Gemini API.")
+        options = {'api_key': API_KEY} if LLM_BACKEND == 'gemini' else {}
+        model = create_backend(LLM_BACKEND, **options)
+        # Quick test to ensure the API key / server is valid
+        model.generate("test")
+        print(f"Successfully connected to the '{model.name}' backend.")
         return model
     except Exception as e:
-        print(f"Error initializing Gemini API: {e}")
-        print("Please check your API_KEY in the script.")
+        print(f"Error initializing the LLM backend: {e}")
+        print("Please check your API_KEY (or LLM_BACKEND) in the script.")
         return None
 
 def generate_ontology_batch(model, skill_batch):
@@ -78,9 +81,7 @@ def generate_ontology_batch(model, skill_batch):
     """
 
     try:
-        response = model.generate_content(prompt,
-                                          generation_config={"temperature": 0.1}) # Low temperature for consistent formatting
-        return response.text
+        return model.generate(prompt, temperature=0.1) # Low temperature for consistent formatting
     except Exception as e:
         print(f"  -- API call failed for a batch. Error: {e}. Skipping this batch.")
         return ""
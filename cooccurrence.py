@@ -0,0 +1,359 @@
+# cooccurrence.py
+import argparse
+import hashlib
+import multiprocessing
+import os
+import time
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from corpus import CORPUS_DIR, PostingReader, load_corpus, parse_posting
+
+# --- CONFIGURATION ---
+# Each row of this file is the (ragged) list of skills attached to one job posting.
+INPUT_SKILLS_FILE = "csv/skillsFreelancerFinal.csv"
+
+# Sparse outputs consumed by applicationv3 (see SkillAnalytics / load_sparse_co_occurrence).
+# The counts file also records how far into INPUT_SKILLS_FILE it has read, for --incremental runs.
+OUTPUT_COUNTS_FILE = "csv/co_occurrence_counts.npz"
+OUTPUT_MATRIX_FILE = "csv/co_occurrence_sparse.npz"
+
+
+def _chunks(postings, chunk_size):
+    """Groups an iterable of postings into lists of at most `chunk_size` postings."""
+    chunk = []
+    for posting in postings:
+        chunk.append(posting)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def count_chunk(chunk, skill_to_id):
+    """
+    Counts one chunk of postings. New skills are added to `skill_to_id` (dict, O(1) per skill).
+    Returns the (row, col, count) COO arrays of the chunk's pair counts, diagonal included.
+    """
+    ids = []
+    indptr = [0]
+    for posting in chunk:
+        row_ids = {skill_to_id.setdefault(skill, len(skill_to_id)) for skill in posting}
+        ids.extend(row_ids)
+        indptr.append(len(ids))
+
+    indicator = sparse.csr_matrix(
+        (np.ones(len(ids), dtype=np.int32), np.asarray(ids, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(chunk), len(skill_to_id))
+    )
+    # (postings x skills)^T (postings x skills) gives every pair count of the chunk in one sparse product.
+    pairs = (indicator.T @ indicator).tocoo()
+    return pairs.row, pairs.col, pairs.data
+
+
+def _count_chunk_worker(task):
+    """Pool worker: parses (if needed) and counts one chunk against a private vocabulary."""
+    chunk, raw = task
+    if raw:
+        chunk = [parse_posting(line) for line in chunk]
+    local_skill_to_id = {}
+    row, col, data = count_chunk(chunk, local_skill_to_id)
+    return list(local_skill_to_id), row, col, data, len(chunk)
+
+
+def _counted_chunks(postings, chunk_size, skill_to_id, workers):
+    """
+    Yields (row, col, count, n_rows) per chunk with ids from the shared `skill_to_id`.
+    With several workers each chunk is counted in its own process (map) and its local ids are
+    remapped here (reduce). Pool.imap keeps chunk order, so skills receive ids in the same
+    first-seen order as the serial path and the summed counts are identical.
+    """
+    if workers <= 1:
+        for chunk in _chunks(postings, chunk_size):
+            row, col, data = count_chunk(chunk, skill_to_id)
+            yield row, col, data, len(chunk)
+        return
+
+    # A PostingReader hands raw lines to the workers so CSV parsing is parallelized as well.
+    raw = isinstance(postings, PostingReader)
+    items = postings.lines() if raw else postings
+    with multiprocessing.Pool(workers) as pool:
+        tasks = ((chunk, raw) for chunk in _chunks(items, chunk_size))
+        for local_skills, row, col, data, n_rows in pool.imap(_count_chunk_worker, tasks):
+            remap = np.fromiter(
+                (skill_to_id.setdefault(skill, len(skill_to_id)) for skill in local_skills),
+                dtype=np.int32, count=len(local_skills)
+            )
+            yield remap[row], remap[col], data, n_rows
+
+
+def build_co_occurrence(postings, skills=None, chunk_size=10000, workers=1, verbose=True):
+    """
+    Counts skill co-occurrences as a sparse (CSR) matrix.
+    Returns (skills, counts) where counts[i, j] is the number of postings containing
+    both skills and the diagonal holds the number of postings containing each skill.
+    Passing an existing `skills` list keeps those ids and appends newly seen skills.
+    Postings are processed in chunks whose COO pair arrays are summed into one sparse matrix;
+    `workers` > 1 counts the chunks in parallel processes with identical results.
+    """
+    skill_to_id = {skill: skill_id for skill_id, skill in enumerate(skills or [])}
+    counts = sparse.csr_matrix((len(skill_to_id), len(skill_to_id)), dtype=np.int64)
+    rows = 0
+    started = time.perf_counter()
+    for row, col, data, n_rows in _counted_chunks(postings, chunk_size, skill_to_id, workers):
+        size = len(skill_to_id)
+        counts.resize((size, size))
+        counts = counts + sparse.coo_matrix((data.astype(np.int64), (row, col)), shape=(size, size)).tocsr()
+        rows += n_rows
+        if verbose:
+            elapsed = time.perf_counter() - started
+            print(f"  {rows} rows, {size} skills ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
+    size = len(skill_to_id)
+    counts.resize((size, size))
+    counts.sort_indices()
+    return list(skill_to_id), counts
+
+
+def build_co_occurrence_from_corpus(corpus, chunk_size=100000, verbose=True):
+    """
+    Same result as build_co_occurrence() but read from a compiled, memory-mapped Corpus: the
+    skill ids are already interned, so each chunk is a zero-parse slice of the id array.
+    """
+    size = len(corpus.skills)
+    counts = sparse.csr_matrix((size, size), dtype=np.int64)
+    started = time.perf_counter()
+    for start in range(0, len(corpus), chunk_size):
+        indicator = corpus.indicator(start, start + chunk_size)
+        counts = counts + (indicator.T @ indicator).astype(np.int64)
+        if verbose:
+            rows = min(start + chunk_size, len(corpus))
+            elapsed = time.perf_counter() - started
+            print(f"  {rows} rows, {size} skills ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+    counts = counts.tocsr()
+    counts.sort_indices()
+    return list(corpus.skills), counts
+
+
+def merge_counts(old_counts, new_counts):
+    """Adds two count matrices whose vocabularies share a prefix (the newer one may be larger)."""
+    old_counts = old_counts.tocsr(copy=True)
+    old_counts.resize(new_counts.shape)
+    merged = (old_counts + new_counts).tocsr()
+    merged.sort_indices()
+    return merged
+
+
+def conditional_probability(counts):
+    """
+    Normalizes raw counts into P(i|j) = count(i, j) / count(j, j).
+    Rows are the skill being inferred and columns the evidence skill, which is the
+    orientation of the transposed CSV matrix the app has always loaded.
+    """
+    return co_occurrence_metrics(counts, n_postings=None, metrics=('conditional',))['conditional']
+
+
+# Normalizations derived from the raw counts; 'conditional' is the one the app uses by default.
+METRICS = ('conditional', 'pmi', 'jaccard', 'lift')
+
+
+def co_occurrence_metrics(counts, n_postings, metrics=METRICS):
+    """
+    Derives several association measures from the exact pair counts in one vectorized pass
+    over the non-zero entries. With f(i) = count(i, i) (document frequency) and N postings:
+      conditional  P(i|j) = c(i, j) / f(j)
+      jaccard      c(i, j) / (f(i) + f(j) - c(i, j))
+      lift         c(i, j) * N / (f(i) * f(j))
+      pmi          log(lift)
+    Every result shares the sparsity pattern of `counts` (pairs that never co-occur stay 0).
+    Returns a dict of metric name -> CSR matrix.
+    """
+    counts = counts.tocsr()
+    counts.sort_indices()
+    frequency = counts.diagonal().astype(np.float64)
+    rows = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+    cols = counts.indices
+    pair = counts.data.astype(np.float64)
+    f_row, f_col = frequency[rows], frequency[cols]
+
+    values = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if 'conditional' in metrics:
+            values['conditional'] = pair / f_col
+        if 'jaccard' in metrics:
+            values['jaccard'] = pair / (f_row + f_col - pair)
+        if 'lift' in metrics or 'pmi' in metrics:
+            lift = pair * n_postings / (f_row * f_col)
+            values['lift'] = lift
+            values['pmi'] = np.log(lift)
+
+    return {
+        name: sparse.csr_matrix(
+            (np.nan_to_num(values[name], nan=0.0, posinf=0.0, neginf=0.0), cols.copy(), counts.indptr.copy()),
+            shape=counts.shape
+        )
+        for name in metrics
+    }
+
+
+def save_co_occurrence(path, counts, skills, n_postings):
+    """
+    Saves every metric in one .npz sharing a single indices/indptr. `data` holds the default
+    P(i|j) (so older loaders keep working) and `data_<metric>` the alternatives.
+    """
+    metrics = co_occurrence_metrics(counts, n_postings)
+    conditional = metrics.pop('conditional')
+    save_sparse_matrix(path, conditional, skills,
+                       **{f"data_{name}": matrix.data for name, matrix in metrics.items()},
+                       n_postings=n_postings)
+
+
+def save_sparse_matrix(path, matrix, skills, **metadata):
+    """Saves a CSR matrix, its skill labels and optional scalar metadata into a single .npz file."""
+    matrix = matrix.tocsr()
+    np.savez_compressed(
+        path,
+        data=matrix.data,
+        indices=matrix.indices,
+        indptr=matrix.indptr,
+        shape=np.asarray(matrix.shape),
+        skills=np.asarray(skills, dtype=str),
+        **{key: np.asarray(value) for key, value in metadata.items()}
+    )
+
+
+def load_counts(path):
+    """Loads a counts file written by save_sparse_matrix. Returns (skills, counts, metadata dict)."""
+    with np.load(path) as data:
+        counts = sparse.csr_matrix((data['data'], data['indices'], data['indptr']), shape=tuple(data['shape']))
+        skills = data['skills'].tolist()
+        metadata = {key: data[key].item() for key in data.files
+                    if key not in ('data', 'indices', 'indptr', 'shape', 'skills')}
+    return skills, counts, metadata
+
+
+def save_dense_csv(path, matrix, skills):
+    """Writes a matrix as the legacy dense CSV (skill labels on both axes) used by transpose.py and friends."""
+    pd.DataFrame(matrix.toarray(), index=skills, columns=skills).to_csv(path)
+
+
+def _prefix_digest(path, length):
+    """SHA-256 of the first `length` bytes of a file, used to detect rewritten (not appended) inputs."""
+    digest = hashlib.sha256()
+    remaining = length
+    with open(path, 'rb') as f:
+        while remaining > 0:
+            block = f.read(min(remaining, 1 << 20))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+def _ends_row(path, offset):
+    """True if `offset` is the start of the file or just past a newline, i.e. no row was cut short there."""
+    if offset == 0:
+        return True
+    with open(path, 'rb') as f:
+        f.seek(offset - 1)
+        return f.read(1) == b'\n'
+
+
+def dense_csv_to_sparse(path):
+    """Converts a legacy dense co-occurrence CSV (skill labels on both axes) into (skills, CSR)."""
+    df = pd.read_csv(path, index_col=0)
+    df.index = df.index.str.lower().str.strip()
+    df.columns = df.columns.str.lower().str.strip()
+    df = df.reindex(columns=df.index, fill_value=0.0)
+    return df.index.tolist(), sparse.csr_matrix(df.fillna(0.0).to_numpy(dtype=np.float64))
+
+
+def update_counts(input_file=INPUT_SKILLS_FILE, counts_file=OUTPUT_COUNTS_FILE, incremental=False, workers=1):
+    """
+    Builds (or, with `incremental`, extends) the persisted raw counts. An incremental run only
+    reads the bytes appended to `input_file` since the last run; if the file was rewritten
+    instead of appended to, or the last run ended inside an unterminated row, it falls back to
+    a full rebuild.
+    Returns (skills, counts, new_rows, total_rows).
+    """
+    skills, counts, offset, rows_total = None, None, 0, 0
+    if incremental and os.path.exists(counts_file):
+        skills, counts, metadata = load_counts(counts_file)
+        offset = int(metadata.get('byte_offset', 0))
+        rows_total = int(metadata.get('rows_processed', 0))
+        unchanged = (
+            metadata.get('source') == input_file
+            and metadata.get('skip_header') is False  # Older counts skipped the first posting as a header
+            and os.path.getsize(input_file) >= offset
+            and _ends_row(input_file, offset)
+            and metadata.get('prefix_sha256') == _prefix_digest(input_file, offset)
+        )
+        if not unchanged:
+            print(f"'{input_file}' no longer matches the saved counts; rebuilding from scratch.")
+            skills, counts, offset, rows_total = None, None, 0, 0
+
+    # Incremental runs leave a trailing row without a newline for the next run, as it may still be written
+    reader = PostingReader(input_file, offset=offset, defer_partial=incremental)
+    new_skills, new_counts = build_co_occurrence(reader, skills=skills, workers=workers)
+    counts = new_counts if counts is None else merge_counts(counts, new_counts)
+    rows_total += reader.rows
+
+    save_sparse_matrix(
+        counts_file, counts, new_skills,
+        source=input_file,
+        byte_offset=reader.offset,
+        rows_processed=rows_total,
+        prefix_sha256=_prefix_digest(input_file, reader.offset),
+        skip_header=False
+    )
+    return new_skills, counts, reader.rows, rows_total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the sparse skill co-occurrence matrix.")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only fold rows appended to the input since the last run into the saved counts.")
+    parser.add_argument('--from-dense', metavar='CSV',
+                        help="Convert an existing dense co-occurrence CSV instead of counting postings.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processes used to count chunks in parallel (0 = all CPU cores). Output is identical.")
+    parser.add_argument('--corpus', nargs='?', const=CORPUS_DIR, metavar='DIR',
+                        help="Count from the compiled binary corpus (see corpus.py), compiling it first if needed.")
+    parser.add_argument('--input', default=INPUT_SKILLS_FILE)
+    args = parser.parse_args()
+
+    if args.from_dense:
+        print(f"Converting dense matrix '{args.from_dense}' to sparse format...")
+        skills, matrix = dense_csv_to_sparse(args.from_dense)
+        save_sparse_matrix(OUTPUT_MATRIX_FILE, matrix, skills)
+        print(f"Saved {len(skills)} skills / {matrix.nnz} non-zero entries to '{OUTPUT_MATRIX_FILE}'.")
+        return
+
+    if args.corpus:
+        print(f"Step 1: Counting co-occurrences from the corpus in '{args.corpus}'.")
+        corpus = load_corpus(args.corpus, source=args.input)
+        skills, counts = build_co_occurrence_from_corpus(corpus)
+        new_rows = n_postings = len(corpus)
+        save_sparse_matrix(OUTPUT_COUNTS_FILE, counts, skills, rows_processed=n_postings)
+    else:
+        mode = "Updating" if args.incremental else "Counting"
+        print(f"Step 1: {mode} co-occurrences from '{args.input}'.")
+        workers = args.workers or os.cpu_count()
+        skills, counts, new_rows, n_postings = update_counts(
+            args.input, OUTPUT_COUNTS_FILE, incremental=args.incremental, workers=workers
+        )
+    print(f"Processed {new_rows} new postings; {len(skills)} unique skills and {counts.nnz} non-zero pairs.")
+
+    print(f"Step 2: Re-deriving the normalized matrices ({', '.join(METRICS)}).")
+    save_co_occurrence(OUTPUT_MATRIX_FILE, counts, skills, n_postings)
+
+    dense_bytes = len(skills) ** 2 * 8
+    sparse_bytes = counts.data.nbytes + counts.indices.nbytes + counts.indptr.nbytes
+    print(f"\nSuccess! Sparse matrix saved to '{OUTPUT_MATRIX_FILE}' "
+          f"({sparse_bytes / 1e6:.1f} MB in memory vs {dense_bytes / 1e6:.1f} MB dense).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# corpus.py
+# Readers for the scraped skill postings. Each row of the source CSV is one posting with a
+# ragged (variable-length) list of skills, so rows are streamed as-is: there is no need for a
+# column-padded "_equalized" copy or for filtering the NaN cells that padding produces.
+#
+# `Corpus` is the compiled, CSR-like binary form of the same data: one int32 skill id per
+# (posting, skill), an int64 row-offset array and a vocabulary file. It is memory-mapped, so the
+# counting, dedup and co-occurrence scripts load it in milliseconds instead of re-parsing text.
+#
+# skillsFreelancerFinal.csv has no header row (play.py and msoup2.py only append postings with
+# csv.writer), so nothing is skipped unless a reader asks for `skip_header`.
+import array
+import csv
+import json
+import os
+import sys
+import numpy as np
+from scipy import sparse
+
+# --- CONFIGURATION ---
+INPUT_SKILLS_FILE = "csv/skillsFreelancerFinal.csv"
+CORPUS_DIR = "csv/postings_corpus"
+CORPUS_VERSION = 1
+
+
+def parse_posting(line):
+    """Returns the cleaned, lower-cased skill list of one raw CSV line (bytes)."""
+    row = next(csv.reader([line.decode('utf-8')]), [])
+    skills = [skill.strip().lower() for skill in row]
+    return [skill for skill in skills if skill and skill != 'nan']
+
+
+class PostingReader:
+    """
+    Streams the cleaned, lower-cased skill list of every posting in a ragged skills CSV,
+    starting at byte `offset`. After iteration, `offset` points just past the last row read
+    and `rows` is the number of postings read. A final row without a newline may still be
+    being appended; with `defer_partial` (by default only when resuming from an offset) it is
+    left for the next run instead of being read.
+    """
+    def __init__(self, path, offset=0, skip_header=False, defer_partial=None):
+        self.path = path
+        self.offset = offset
+        self.skip_header = skip_header and offset == 0
+        self.defer_partial = offset > 0 if defer_partial is None else defer_partial
+        self.rows = 0
+
+    def lines(self):
+        """Yields the raw bytes of each posting row (parsing is left to the caller)."""
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            for line in f:
+                if self.defer_partial and not line.endswith(b'\n'):
+                    break
+                self.offset += len(line)
+                if self.skip_header:
+                    self.skip_header = False
+                    continue
+                self.rows += 1
+                yield line
+
+    def __iter__(self):
+        return map(parse_posting, self.lines())
+
+
+def read_postings(path, skip_header=False):
+    """Yields the cleaned, lower-cased skill list of every posting in a ragged skills CSV."""
+    return iter(PostingReader(path, skip_header=skip_header))
+
+
+def count_postings(path, skip_header=False):
+    """Counts posting rows without parsing them."""
+    reader = PostingReader(path, skip_header=skip_header)
+    for _ in reader.lines():
+        pass
+    return reader.rows
+
+
+class Corpus:
+    """
+    Memory-mapped postings corpus. Posting i owns ids[offsets[i]:offsets[i + 1]], each an index
+    into `skills`. Skills are unique within a posting and keep their original order.
+    """
+    def __init__(self, corpus_dir=CORPUS_DIR):
+        self.corpus_dir = corpus_dir
+        with open(os.path.join(corpus_dir, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.ids = np.load(os.path.join(corpus_dir, 'ids.npy'), mmap_mode='r')
+        self.offsets = np.load(os.path.join(corpus_dir, 'offsets.npy'), mmap_mode='r')
+        with open(os.path.join(corpus_dir, 'skills.txt'), encoding='utf-8') as f:
+            self.skills = f.read().split('\n')[:-1]
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def posting_ids(self, i):
+        """Skill ids of posting i."""
+        return self.ids[self.offsets[i]:self.offsets[i + 1]]
+
+    def __iter__(self):
+        """Yields every posting as a list of skill strings (for code that still wants text)."""
+        for i in range(len(self)):
+            yield [self.skills[skill_id] for skill_id in self.posting_ids(i)]
+
+    def indicator(self, start=0, stop=None):
+        """Binary (postings x skills) CSR matrix for rows [start, stop), built without copying the ids."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        indptr = np.asarray(self.offsets[start:stop + 1]) - self.offsets[start]
+        indices = self.ids[self.offsets[start]:self.offsets[stop]]
+        data = np.ones(len(indices), dtype=np.int32)
+        return sparse.csr_matrix((data, indices, indptr), shape=(stop - start, len(self.skills)), copy=False)
+
+    def skill_counts(self):
+        """Number of postings containing each skill, aligned with `skills`."""
+        return np.bincount(self.ids, minlength=len(self.skills))
+
+    def row_keys(self, sort=True):
+        """One hashable key per posting (its ids, sorted by default) for duplicate detection."""
+        return [
+            (np.sort(self.posting_ids(i)) if sort else self.posting_ids(i)).tobytes()
+            for i in range(len(self))
+        ]
+
+
+def _source_stat(source):
+    """(size, mtime_ns) of the source CSV, used to notice when the corpus is out of date."""
+    if source is None or not os.path.exists(source):
+        return None
+    stat = os.stat(source)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def write_corpus(postings, corpus_dir=CORPUS_DIR, source=None, skip_header=False):
+    """
+    One-time converter: streams postings (lists of skill strings) into the binary corpus format.
+    `source` and `skip_header` only describe where the postings came from, for load_corpus().
+    """
+    skill_to_id = {}
+    ids = array.array('i')
+    offsets = array.array('q', [0])
+    for posting in postings:
+        ids.extend(dict.fromkeys(skill_to_id.setdefault(skill, len(skill_to_id)) for skill in posting))
+        offsets.append(len(ids))
+
+    os.makedirs(corpus_dir, exist_ok=True)
+    np.save(os.path.join(corpus_dir, 'ids.npy'), np.frombuffer(ids, dtype=np.int32))
+    np.save(os.path.join(corpus_dir, 'offsets.npy'), np.frombuffer(offsets, dtype=np.int64))
+    with open(os.path.join(corpus_dir, 'skills.txt'), 'w', encoding='utf-8') as f:
+        f.writelines(f"{skill}\n" for skill in skill_to_id)
+    meta = {'version': CORPUS_VERSION, 'source': source, 'source_stat': _source_stat(source), 'skip_header': skip_header,
+            'postings': len(offsets) - 1, 'skills': len(skill_to_id), 'entries': len(ids)}
+    with open(os.path.join(corpus_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def load_corpus(corpus_dir=CORPUS_DIR, source=INPUT_SKILLS_FILE, skip_header=False):
+    """
+    Opens the compiled corpus, (re)converting `source` first if it is missing or out of date.
+    Pass `skip_header` for sources written with a header row (e.g. by pandas' to_csv).
+    """
+    meta_path = os.path.join(corpus_dir, 'meta.json')
+    meta = {}
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+    if (meta.get('version') != CORPUS_VERSION or meta.get('source_stat') != _source_stat(source)
+            or meta.get('skip_header') != skip_header):
+        print(f"Compiling '{source}' into '{corpus_dir}'...")
+        write_corpus(PostingReader(source, skip_header=skip_header), corpus_dir, source=source, skip_header=skip_header)
+    return Corpus(corpus_dir)
+
+
+if __name__ == "__main__":
+    # `python corpus.py [file] [corpus_dir]` compiles the ragged CSV into the binary corpus.
+    path = sys.argv[1] if len(sys.argv) > 1 else INPUT_SKILLS_FILE
+    corpus_dir = sys.argv[2] if len(sys.argv) > 2 else CORPUS_DIR
+    meta = write_corpus(PostingReader(path), corpus_dir, source=path)
+    print(f"{meta['postings']} postings / {meta['skills']} skills / {meta['entries']} entries "
+          f"from '{path}' written to '{corpus_dir}'.")
@@ -1,17 +1,17 @@
 import pandas as pd
+from corpus import load_corpus
 
-# Load the CSV file into a DataFrame
-df = pd.read_csv('skillsFreelancerFinal_equalized.csv',low_memory=False)
+# Load the memory-mapped postings corpus (compiled from skillsFreelancerFinal.csv on first use)
+corpus = load_corpus('postings_corpus', source='skillsFreelancerFinal.csv')
 
+# Count the postings containing each unique skill straight from the int32 id array.
+# Note: this is a document frequency over cleaned skills (lower-cased, each skill counted once per
+# posting), not the raw, case-sensitive cell count the old df.stack().value_counts() produced.
+counts = corpus.skill_counts()
+order = counts.argsort(kind='stable')[::-1]
 
-# Count the occurrences of each unique value in the DataFrame
-value_counts = df.stack().value_counts()
-
-# Convert the Series to a DataFrame
-value_counts_df = value_counts.reset_index()
-
-# Rename the columns of the DataFrame
-value_counts_df.columns = ['value', 'count']
+# Convert the counts to a DataFrame
+value_counts_df = pd.DataFrame({'value': [corpus.skills[i] for i in order], 'count': counts[order]})
 
 # Save the DataFrame to a new CSV file
 value_counts_df.to_csv('value_counts_clean_not_clean.csv', index=False)
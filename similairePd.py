@@ -1,53 +1,14 @@
-import itertools
-import pandas as pd
-import numpy as np
+# similairePd.py
+# Dense P(j|i) matrix of the de-duplicated postings (skills_no_duplicate.csv), printing the skill list.
+from cooccurrence import PostingReader, build_co_occurrence, conditional_probability, save_dense_csv
 
-# Read the CSV file into a DataFrame
-df = pd.read_csv("csv/skills_no_duplicate.csv", header=None)
+INPUT_SKILLS_FILE = "csv/skills_no_duplicate.csv"
+OUTPUT_MATRIX_FILE = 'correspendentFinalClean.csv'
 
-# Initialize an empty dictionary to store the words and their connections
-words = {}
-
-# Iterate over each row in the DataFrame
-for row in df.itertuples(index=False):
-    parts = row._asdict()
-    for a, b in itertools.combinations(parts.values(), 2):
-        if a and b:
-            if a not in words:
-                words[a] = [b]
-            else:
-                words[a].append(b)
-            if b not in words:
-                words[b] = [a]
-            else:
-                words[b].append(a)
-
-# Print the words dictionary
-print(words)
-
-# Get the size and keys of the words dictionary
-size = len(words)
-keys = list(words.keys())
-
-# Initialize a numpy array to track the connections
-track = np.zeros((size, size))
-
-# Populate the track array
-for i, k in enumerate(keys):
-    track[i, i] = len(words[k])
-    for j in words[k]:
-        track[i, keys.index(j)] += 1
-        track[keys.index(j), i] += 1
+skills, counts = build_co_occurrence(PostingReader(INPUT_SKILLS_FILE, skip_header=False))
 
 # Print the keys
-print(keys)
-
-# Scale the track array to [0,1]
-for row in range(track.shape[0]):
-    track[row, :] /= track[row, row]
-
-# Create a DataFrame from the track array
-track_df = pd.DataFrame(track, index=keys, columns=keys)
+print(skills)
 
-# Save the DataFrame to a CSV file
-track_df.to_csv('correspendentFinalClean.csv')
+# Scale to [0,1] (P(j|i) per row) and save the labelled matrix
+save_dense_csv(OUTPUT_MATRIX_FILE, conditional_probability(counts).T, skills)
@@ -1,20 +1,24 @@
+from collections import Counter
 import pandas as pd
+from corpus import load_corpus
 
-# Load the CSV file into a DataFrame
-df = pd.read_csv('skills_no_duplicate_sorted.csv')
+# Load the memory-mapped corpus (compiled from the CSV on first use; pandas wrote it with a header row)
+corpus = load_corpus('skills_no_duplicate_sorted_corpus', source='skills_no_duplicate_sorted.csv', skip_header=True)
 
-# Remove duplicate rows
-df = df.drop_duplicates()
+# Remove duplicate rows (same skills in the same order)
+unique_rows = {}
+for i, key in enumerate(corpus.row_keys(sort=False)):
+    unique_rows.setdefault(key, i)
 
-# Sort each row’s values, convert them to strings, and store as tuples
-df_sorted = df.apply(lambda row: tuple(sorted(map(str, row.dropna()))), axis=1)
-
-# Count occurrences of each unique sorted row
-row_counts = df_sorted.value_counts()
+# Count occurrences of each unique row once its skills are sorted
+row_counts = Counter(
+    tuple(sorted(corpus.skills[skill_id] for skill_id in corpus.posting_ids(i))) for i in unique_rows.values()
+).most_common()
 
 # Create a new DataFrame with the counts
-df_unique_counts = pd.DataFrame(row_counts, columns=['count']).reset_index()
-df_unique_counts.columns = [f'Column_{i+1}' for i in range(df_unique_counts.shape[1] - 1)] + ['count']
+df_unique_counts = pd.DataFrame([row for row, _ in row_counts])
+df_unique_counts.columns = [f'Column_{i+1}' for i in range(df_unique_counts.shape[1])]
+df_unique_counts['count'] = [count for _, count in row_counts]
 
 # Save the resulting DataFrame to a new CSV file
 df_unique_counts.to_csv('skills_counted.csv', index=False)
@@ -1,23 +1,20 @@
+from collections import Counter
+import numpy as np
 import pandas as pd
+from corpus import load_corpus
 
-# Load the CSV file into a DataFrame
-df = pd.read_csv('skillsFreelancerFinal_equalized.csv',low_memory=False)
+# Load the memory-mapped postings corpus (compiled from skillsFreelancerFinal.csv on first use)
+corpus = load_corpus('postings_corpus', source='skillsFreelancerFinal.csv')
 
+# Key each posting by its sorted skill ids and count occurrences of each unique sorted row
+row_counts = Counter(corpus.row_keys(sort=True)).most_common()
 
-# Sort each row’s values, convert them to strings, and store as tuples
-df_sorted = df.apply(lambda row: tuple(sorted(map(str, row.dropna()))), axis=1)
-
-# Count occurrences of each unique sorted row
-row_counts = df_sorted.value_counts()
-
-# Create a new DataFrame with the counts
-df_unique_counts = pd.DataFrame(row_counts, columns=['count']).reset_index()
-
-# Split tuple values into separate columns
-df_unique_counts = pd.DataFrame(df_unique_counts['index'].to_list(), columns=[f'Skill_{i+1}' for i in range(df_unique_counts['index'].str.len().max())])
+# Split the sorted skill names into separate columns
+rows = [sorted(corpus.skills[skill_id] for skill_id in np.frombuffer(key, dtype=corpus.ids.dtype)) for key, _ in row_counts]
+df_unique_counts = pd.DataFrame(rows, columns=[f'Skill_{i+1}' for i in range(max(map(len, rows), default=0))])
 
 # Add the count column back to the DataFrame
-df_unique_counts['count'] = row_counts.values
+df_unique_counts['count'] = [count for _, count in row_counts]
 
 # Save the resulting DataFrame to a new CSV file
 df_unique_counts.to_csv('skills_counted_not_clean.csv', index=False)